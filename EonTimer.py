@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
+import time
+
+# taken before anything heavy is imported, so the logged startup time covers the imports
+STARTED_AT = time.perf_counter_ns()
+
+import gc
+import logging
+import multiprocessing
 import os
 import signal
 import sys
 
+from PySide6.QtCore import QTimer
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QApplication
 
 from eon_timer import resources
 from eon_timer.app_window import AppWindow
+from eon_timer.settings.advanced.model import AdvancedSettingsModel
 from eon_timer.util.injector.app_context import AppContext
 from eon_timer.util.injector.provider import InstanceProvider
 
@@ -23,10 +33,23 @@ def main() -> int:
     context = AppContext(['eon_timer'], provided={QApplication: InstanceProvider(app)})
     app_window = context.get_component(AppWindow)
     app_window.show()
+    # measured once the event loop first runs, when the window can actually be used
+    QTimer.singleShot(0, __log_startup)
+    if context.get_component(AdvancedSettingsModel).gc_control.get():
+        # move everything created during startup out of the collector's reach
+        gc.freeze()
     return app.exec()
 
 
+def __log_startup():
+    # the same measurement as EonTimerCLI#startup: script start until a run can be started
+    logging.info(f'> INFO: EonTimer#startup: {(time.perf_counter_ns() - STARTED_AT) / 1_000_000:.1f}ms')
+
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    # the engine reports trigger error, alignment, refresh and stop latency through logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     signal.signal(signal.SIGINT, signal.SIG_DFL)
     os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = 'hide'
     sys.exit(main())
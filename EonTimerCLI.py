@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+import time
+
+# taken before anything heavy is imported, so the logged startup time covers the imports
+STARTED_AT = time.perf_counter_ns()
+
+import multiprocessing
+import os
+import sys
+
+from eon_timer import cli
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = 'hide'
+    sys.exit(cli.main(STARTED_AT))
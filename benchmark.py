@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from array import array
+
+from PySide6.QtCore import QCoreApplication, QSettings
+
+from eon_timer.app_state import AppState
+from eon_timer.engine import Timeline
+from eon_timer.engine.backends import is_backend_supported
+from eon_timer.engine.engine import EngineListener, EngineRun, PhaseEngine, RunPlan, RunStats
+from eon_timer.phase_runner import PhaseRunner
+from eon_timer.scheduler import Scheduler
+from eon_timer.settings.action.model import ActionSettingsModel
+from eon_timer.settings.advanced.model import AdvancedSettingsModel
+from eon_timer.settings.timer.model import MissPolicy, TimerBackend, TimerSettingsModel, WaitPolicy
+from eon_timer.timers.plan import NANOSECONDS_PER_MILLISECOND, create_plan
+from eon_timer.util.clock import Clock
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(required=True)
+    # scheduler
+    subparser = subparsers.add_parser('scheduler', help='Measure trigger error with N concurrent timers')
+    subparser.add_argument('-n', '--timers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    subparser.add_argument('-p', '--phases', type=int, default=4)
+    subparser.add_argument('-l', '--phase-length', type=float, default=1000.0, help='milliseconds')
+    subparser.add_argument('-b', '--backend', choices=[it.value for it in TimerBackend],
+                           default=TimerBackend.CLOCK_NANOSLEEP.value)
+    subparser.add_argument('--spin-window', type=int, default=1, help='milliseconds')
+    subparser.set_defaults(func=scheduler)
+    # stop
+    subparser = subparsers.add_parser('stop', help='Measure how long stopping a run takes on each backend')
+    subparser.add_argument('-b', '--backends', choices=[it.value for it in TimerBackend], nargs='+',
+                           default=[it.value for it in TimerBackend])
+    subparser.add_argument('-r', '--repeat', type=int, default=20)
+    subparser.set_defaults(func=stop)
+
+    # parse arguments
+    args = parser.parse_args()
+    return args.func(args)
+
+
+def scheduler(args: argparse.Namespace) -> int:
+    backend = TimerBackend(args.backend)
+    if backend == TimerBackend.QT_PRECISE_TIMER:
+        print('The Qt backend needs a running Qt application', file=sys.stderr)
+        return -1
+    print(f'{"timers":>6} {"threads":>7} {"actions":>7} {"mean":>9} {"p99":>9} {"max":>9} {"wakeups/s":>9}')
+    for timers in args.timers:
+        if timers < 1:
+            print(f'Invalid timer count {timers}', file=sys.stderr)
+            return -1
+        __run_scheduler(timers, args.phases, args.phase_length, backend, args.spin_window)
+    return 0
+
+
+def stop(args: argparse.Namespace) -> int:
+    if args.repeat < 1:
+        print(f'Invalid repeat count {args.repeat}', file=sys.stderr)
+        return -1
+    backends = [TimerBackend(it) for it in args.backends]
+    # PhaseRunner is a QObject and the precise timer's worker runs its own event loop
+    app = QCoreApplication.instance() or QCoreApplication([])
+    app.setApplicationName('EonTimerBenchmark')
+    print(f'{"backend":>16} {"stops":>5} {"mean":>9} {"p99":>9} {"max":>9}')
+    with tempfile.TemporaryDirectory() as directory:
+        # the saved settings are left alone; every model starts from its defaults
+        settings = QSettings(os.path.join(directory, 'settings.ini'), QSettings.Format.IniFormat)
+        for backend in backends:
+            if not is_backend_supported(backend):
+                print(f'{backend.value:>16} not supported on this platform')
+                continue
+            __run_stop(settings, backend, args.repeat)
+    return 0
+
+
+def __run_stop(settings: QSettings, backend: TimerBackend, repeat: int):
+    """ Times PhaseRunner.stop(), the path the Stop button takes """
+    timer_settings = TimerSettingsModel(settings)
+    timer_settings.timer_backend.set(backend)
+    scheduler = Scheduler()
+    scheduler._on_start()
+    state = AppState()
+    runner = PhaseRunner(state, timer_settings, ActionSettingsModel(settings), AdvancedSettingsModel(settings), scheduler)
+    # one long phase, so every stop lands in the middle of a wait of up to a second
+    state.phases = create_plan([60_000.0])
+    latencies = []
+    for _ in range(repeat):
+        runner.start()
+        time.sleep(random.uniform(0.05, 0.3))
+        stop_start = time.perf_counter_ns()
+        runner.stop()
+        latencies.append(time.perf_counter_ns() - stop_start)
+    scheduler._on_close()
+
+    latencies.sort()
+    mean = statistics.fmean(latencies) / 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1000
+    worst = latencies[-1] / 1000
+    print(f'{backend.value:>16} {len(latencies):>5} {mean:>7.1f}us {p99:>7.1f}us {worst:>7.1f}us')
+
+
+class __Collector(EngineListener):
+    def __init__(self):
+        self.stats: RunStats | None = None
+
+    def on_run_finished(self, stats: RunStats):
+        self.stats = stats
+
+
+def __run_scheduler(timers: int, phases: int, phase_length: float, backend: TimerBackend, spin_window: int):
+    engine = PhaseEngine()
+    thread = threading.Thread(target=engine.serve, name='EonTimerScheduler')
+    thread.start()
+    start_ns = time.perf_counter_ns() + 100 * NANOSECONDS_PER_MILLISECOND
+    runs: list[tuple[EngineRun, __Collector]] = []
+    for i in range(timers):
+        # staggered so that deadlines interleave instead of all landing on the same instant
+        stagger = phase_length * i / timers
+        timeline = Timeline.compile(create_plan([phase_length + stagger] * phases), 4, 50)
+        plan = RunPlan(timeline, backend, WaitPolicy.ADAPTIVE,
+                       8 * NANOSECONDS_PER_MILLISECOND,
+                       spin_window * NANOSECONDS_PER_MILLISECOND,
+                       5 * NANOSECONDS_PER_MILLISECOND,
+                       MissPolicy.FIRE, None, None)
+        collector = __Collector()
+        runs.append((engine.submit(EngineRun(Clock(start_ns), plan, collector)), collector))
+    # counted while every run is live: adding timers must not add threads
+    threads = threading.active_count()
+    for run, _ in runs:
+        run.finished.wait()
+    engine.close()
+    thread.join()
+
+    trigger_errors = array('q')
+    for _, collector in runs:
+        trigger_errors.extend(collector.stats.trigger_errors)
+    # the runs overlap on one thread, so the longest one has seen every wakeup
+    duration = max(collector.stats.duration for _, collector in runs)
+    wakeups = max(collector.stats.wakeups for _, collector in runs)
+    errors = sorted(trigger_errors)
+    mean = statistics.fmean(errors) / 1000
+    p99 = errors[min(len(errors) - 1, int(len(errors) * 0.99))] / 1000
+    worst = errors[-1] / 1000
+    rate = wakeups / (duration / 1_000_000_000)
+    print(f'{timers:>6} {threads:>7} {len(errors):>7} {mean:>7.1f}us {p99:>7.1f}us {worst:>7.1f}us {rate:>9.1f}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
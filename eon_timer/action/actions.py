@@ -1,7 +1,9 @@
 from typing import Final, Callable
 
 from eon_timer.app_state import AppState
+from eon_timer.phase_runner import PhaseRunner
 from eon_timer.settings.action.model import ActionSettingsModel, ActionSound, ActionMode
+from eon_timer.util.clock import now_ns
 from eon_timer.util.injector import component
 from .sound_manager import SoundManager
 from .visual_manager import VisualManager
@@ -13,12 +15,14 @@ class Actions:
                  state: AppState,
                  sound_manager: SoundManager,
                  visual_manager: VisualManager,
-                 action_settings: ActionSettingsModel):
+                 action_settings: ActionSettingsModel,
+                 phase_runner: PhaseRunner):
         self.__audio_action: Callable = self.__do_nothing
         self.__visual_action: Callable = self.__do_nothing
         self.sound_manager: Final[SoundManager] = sound_manager
         self.visual_manager: Final[VisualManager] = visual_manager
         self.action_settings: Final[ActionSettingsModel] = action_settings
+        self.phase_runner: Final[PhaseRunner] = phase_runner
         action_settings.settings_changed.connect(self.__on_action_settings_changed)
         state.action_triggered.connect(self.__trigger)
         self.__on_action_settings_changed()
@@ -43,9 +47,11 @@ class Actions:
             visual_action = self.visual_manager.activate
         self.__visual_action = visual_action
 
-    def __trigger(self):
+    def __trigger(self, fired_at: int):
+        executed_at = now_ns()
         self.__audio_action()
         self.__visual_action()
+        self.phase_runner.record_dispatch_latency(executed_at - fired_at)
 
     @staticmethod
     def __do_nothing():
@@ -1,91 +1,166 @@
-from typing import Final
+from collections import deque
+from typing import Callable, Final, Optional
 
 from PySide6.QtCore import QObject, Signal
 
+from eon_timer.util.clock import now_ns
 from eon_timer.util.injector import component
+from eon_timer.util.seqlock import Seqlock
 
 
 @component()
 class AppState(QObject):
     phases_changed: Final[Signal] = Signal(list)
-    current_phase_changed: Final[Signal] = Signal(float)
-    current_phase_elapsed_changed: Final[Signal] = Signal(float)
+    # phase durations and elapsed times are integer nanoseconds
+    current_phase_changed: Final[Signal] = Signal(object)
     minutes_before_target_changed: Final[Signal] = Signal(int)
-    next_phase_changed: Final[Signal] = Signal(float)
+    next_phase_changed: Final[Signal] = Signal(object)
 
     running_changed: Final[Signal] = Signal(bool)
-    action_triggered: Final[Signal] = Signal()
+    # phase plans waiting to run back to back after the current one
+    queue_changed: Final[Signal] = Signal(list)
+    # timestamp on the selected clock source at which the action was fired
+    action_triggered: Final[Signal] = Signal(object)
+    # lateness in nanoseconds of a trigger that missed its deadline
+    deadline_missed: Final[Signal] = Signal(object)
+
+    # ----- snapshot fields -----
+    RUNNING: Final[int] = 0
+    PHASE_INDEX: Final[int] = 1
+    PHASE_STARTED_AT: Final[int] = 2
 
     def __init__(self):
         super().__init__()
-        self.__phases: list[float] = []
-        self.__current_phase_index: int = 0
-        self.__current_phase_elapsed: float = 0
+        self.__phases: tuple[int, ...] = ()
+        # the runner publishes progress here instead of signalling every tick; readers on any
+        # thread get a consistent (running, phase_index, phase_started_at) without locking
+        self.__snapshot: Final[Seqlock] = Seqlock(3)
+        self.__queue: Final[deque[tuple[int, ...]]] = deque()
         self.__resetting = False
-        self.__running = False
+        # the clock phase timestamps are taken on; a simulation points this at its virtual clock
+        self.now: Callable[[], int] = now_ns
 
     @property
-    def phases(self) -> list[float]:
-        return list(self.__phases)
+    def phases(self) -> tuple[int, ...]:
+        return self.__phases
 
     @phases.setter
-    def phases(self, phases: list[float]):
+    def phases(self, phases: tuple[int, ...]):
+        phases = tuple(phases)
         if self.__resetting or phases != self.__phases:
-            self.__phases = list(phases)
+            self.__phases = phases
+            self.phases_changed.emit(list(phases))
             self.reset()
 
     @property
-    def current_phase(self) -> float:
-        current_phase = 0
-        if self.__current_phase_index < len(self.__phases):
-            current_phase = self.__phases[self.__current_phase_index]
-        return current_phase
+    def queue(self) -> tuple[tuple[int, ...], ...]:
+        return tuple(self.__queue)
+
+    def enqueue(self, phases: tuple[int, ...]):
+        self.__queue.append(tuple(phases))
+        self.queue_changed.emit(list(self.__queue))
+
+    def clear_queue(self):
+        if self.__queue:
+            self.__queue.clear()
+            self.queue_changed.emit([])
+
+    def advance_queue(self, started_at: int) -> Optional[tuple[int, ...]]:
+        """ Loads the next queued plan as a run that started at `started_at`, keeping the run going """
+        try:
+            phases = self.__queue.popleft()
+        except IndexError:
+            return None
+        self.queue_changed.emit(list(self.__queue))
+        self.__phases = phases
+        self.phases_changed.emit(list(phases))
+        self.begin_phase(0, started_at)
+        self.minutes_before_target_changed.emit(sum(phases) // 60_000_000_000)
+        return phases
+
+    def snapshot(self) -> tuple[bool, int, int]:
+        """ Returns a consistent (running, phase_index, phase_started_at) """
+        running, phase_index, phase_started_at = self.__snapshot.read()
+        return bool(running), phase_index, phase_started_at
+
+    def retarget(self, phases: tuple[int, ...]):
+        """ Replaces the phases of a run in progress without resetting its progress """
+        self.__phases = tuple(phases)
+        self.phases_changed.emit(list(self.__phases))
+        self.__emit_phase_changed(self.current_phase_index)
 
     @property
-    def next_phase(self) -> float:
-        next_phase = 0
-        if self.__current_phase_index + 1 < len(self.__phases):
-            next_phase = self.__phases[self.__current_phase_index + 1]
-        return next_phase
+    def current_phase(self) -> int:
+        return self.__phase_at(self.__snapshot.read()[self.PHASE_INDEX])
+
+    @property
+    def next_phase(self) -> int:
+        return self.__phase_at(self.__snapshot.read()[self.PHASE_INDEX] + 1)
 
     @property
     def current_phase_index(self) -> int:
-        return self.__current_phase_index
+        return self.__snapshot.read()[self.PHASE_INDEX]
 
     @current_phase_index.setter
     def current_phase_index(self, index: int):
-        if self.__resetting or index != self.__current_phase_index:
-            self.__current_phase_index = index
-            self.current_phase_changed.emit(self.current_phase)
-            self.next_phase_changed.emit(self.next_phase)
+        if self.__resetting or index != self.current_phase_index:
+            self.__snapshot.write(index, start=self.PHASE_INDEX)
+            self.__emit_phase_changed(index)
 
     @property
-    def current_phase_elapsed(self) -> float:
-        return self.__current_phase_elapsed
+    def phase_started_at(self) -> int:
+        """ Timestamp on the selected clock source at which the current phase started """
+        return self.__snapshot.read()[self.PHASE_STARTED_AT]
+
+    @phase_started_at.setter
+    def phase_started_at(self, timestamp: int):
+        self.__snapshot.write(timestamp, start=self.PHASE_STARTED_AT)
 
-    @current_phase_elapsed.setter
-    def current_phase_elapsed(self, new_value: float):
-        if self.__resetting or new_value != self.__current_phase_elapsed:
-            self.__current_phase_elapsed = new_value
-            self.current_phase_elapsed_changed.emit(new_value)
+    def begin_phase(self, index: int, started_at: int):
+        """ Moves to phase `index` that started at `started_at`, publishing both at once """
+        self.__snapshot.write(index, started_at, start=self.PHASE_INDEX)
+        self.__emit_phase_changed(index)
+
+    @property
+    def current_phase_elapsed(self) -> int:
+        """ Computed on read, so the display can refresh on its own cadence """
+        running, _, phase_started_at = self.snapshot()
+        if not running:
+            return 0
+        return max(0, self.now() - phase_started_at)
+
+    @property
+    def current_phase_remaining(self) -> int:
+        running, phase_index, phase_started_at = self.snapshot()
+        current_phase = self.__phase_at(phase_index)
+        if not running:
+            return current_phase
+        return max(0, current_phase - max(0, self.now() - phase_started_at))
 
     @property
     def running(self) -> bool:
-        return self.__running
+        return bool(self.__snapshot.read()[self.RUNNING])
 
     @running.setter
     def running(self, new_value: bool):
-        if new_value != self.__running:
-            self.__running = new_value
+        if new_value != self.running:
+            self.__snapshot.write(int(new_value), start=self.RUNNING)
             self.running_changed.emit(new_value)
 
-    def trigger_action(self):
-        self.action_triggered.emit()
+    def trigger_action(self, fired_at: int = 0):
+        self.action_triggered.emit(fired_at or self.now())
 
     def reset(self):
         self.__resetting = True
-        self.current_phase_index = 0
-        self.current_phase_elapsed = 0.0
+        self.begin_phase(0, 0)
         total_time = sum(self.__phases)
-        self.minutes_before_target_changed.emit(int(total_time // 60_000))
+        self.minutes_before_target_changed.emit(total_time // 60_000_000_000)
         self.__resetting = False
+
+    def __phase_at(self, index: int) -> int:
+        phases = self.__phases
+        return phases[index] if index < len(phases) else 0
+
+    def __emit_phase_changed(self, index: int):
+        self.current_phase_changed.emit(self.__phase_at(index))
+        self.next_phase_changed.emit(self.__phase_at(index + 1))
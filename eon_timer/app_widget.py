@@ -7,13 +7,15 @@ from PySide6.QtWidgets import *
 
 from eon_timer.app_state import AppState
 from eon_timer.phase_runner import PhaseRunner
+from eon_timer import timers
 from eon_timer.settings.dialog import SettingsDialog
 from eon_timer.timer_widget import TimerWidget
 from eon_timer.timers.custom.widget import CustomTimerWidget
-from eon_timer.timers.gen3 import Gen3TimerWidget
-from eon_timer.timers.gen4 import Gen4TimerWidget
-from eon_timer.timers.gen5 import Gen5TimerWidget
+from eon_timer.timers.gen3.widget import Gen3TimerWidget
+from eon_timer.timers.gen4.widget import Gen4TimerWidget
+from eon_timer.timers.gen5.widget import Gen5TimerWidget
 from eon_timer.util import pyside
+from eon_timer.util.clock import now_ns
 from eon_timer.util.injector import component
 
 
@@ -40,6 +42,7 @@ class AppWidget(QWidget):
 
         self.tab_widget: Final[QTabWidget] = QTabWidget()
         self.timer_btn: Final[QPushButton] = QPushButton()
+        self.queue_btn: Final[QPushButton] = QPushButton()
         self.update_btn: Final[QPushButton] = QPushButton()
         self.settings_btn: Final[QPushButton] = QPushButton()
         self.__init_components()
@@ -65,11 +68,19 @@ class AppWidget(QWidget):
         self.gen4_timer_widget.timer_changed.connect(self.__update_timer)
         self.gen3_timer_widget.timer_changed.connect(self.__update_timer)
         self.custom_timer_widget.timer_changed.connect(self.__update_timer)
+        self.gen3_timer_widget.target_frame_set.connect(self.__on_target_frame_set)
         self.tab_widget.addTab(self.gen5_timer_widget, '5')
         self.tab_widget.addTab(self.gen4_timer_widget, '4')
         self.tab_widget.addTab(self.gen3_timer_widget, '3')
         self.tab_widget.addTab(self.custom_timer_widget, 'C')
 
+        # ----- queue_btn -----
+        self.queue_btn.setObjectName('queueButton')
+        self.queue_btn.setText('Queue')
+        self.queue_btn.setToolTip('Run this timer right after the current one')
+        layout.addWidget(self.queue_btn, 1, 0, alignment=Qt.AlignmentFlag.AlignBottom)
+        self.queue_btn.clicked.connect(self.__on_queue_btn_clicked)
+        self.queue_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
         # ----- settings_btn -----
         self.settings_btn.setObjectName('settingsButton')
         self.settings_btn.setText(chr(0xf013))
@@ -91,24 +102,43 @@ class AppWidget(QWidget):
         self.timer_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
         self.timer_btn.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
         # ----- running_changed -----
-        disable_on_run = [self.tab_widget, self.settings_btn, self.update_btn]
+        # the gen3 tab stays reachable so a variable target can be set while running; it disables its own fields
+        disable_on_run = [self.tab_widget.tabBar(),
+                          self.gen5_timer_widget,
+                          self.gen4_timer_widget,
+                          self.custom_timer_widget,
+                          self.settings_btn,
+                          self.update_btn]
         self.state.running_changed.connect(
             functools.partial(self.__on_running_changed, disable_on_run)
         )
 
     def __update_timer(self):
+        if self.state.running:
+            # edits made during a run apply to the next one, unless pushed explicitly
+            return
         widget = self.tab_widget.currentWidget()
         create_phases = getattr(widget, 'create_phases')
         if create_phases is not None:
             phases = create_phases()
-            self.state.phases = phases
+            self.state.phases = timers.create_plan(phases)
+
+    def __on_target_frame_set(self):
+        phases = self.gen3_timer_widget.create_phases()
+        self.phase_runner.update_phases(timers.create_plan(phases))
 
     def __on_timer_btn_clicked(self):
         if not self.state.running:
-            self.phase_runner.start()
+            self.phase_runner.start(now_ns())
         else:
             self.phase_runner.stop()
 
+    def __on_queue_btn_clicked(self):
+        widget = self.tab_widget.currentWidget()
+        create_phases = getattr(widget, 'create_phases', None)
+        if create_phases is not None:
+            self.state.enqueue(timers.create_plan(create_phases()))
+
     def __on_update_btn_clicked(self) -> None:
         widget = self.tab_widget.currentWidget()
         calibrate = getattr(widget, 'calibrate', None)
@@ -119,6 +149,8 @@ class AppWidget(QWidget):
         self.timer_btn.setText('Stop' if running else 'Start')
         for widget in disable_on_run:
             widget.setEnabled(not running)
+        if not running:
+            self.__update_timer()
 
     def __on_settings_btn_clicked(self):
         result = self.settings_dialog.exec()
@@ -0,0 +1,214 @@
+import argparse
+import logging
+import sys
+import threading
+import time
+from typing import Callable, Final, Optional, override
+
+from PySide6.QtCore import QCoreApplication, QSettings
+
+from eon_timer.engine import EventKind, Timeline
+from eon_timer.engine.engine import EngineListener, EngineRun, PhaseEngine, RunStats
+from eon_timer.engine.run_plan import create_run_plan
+from eon_timer.settings.action.model import ActionSettingsModel, ActionSound
+from eon_timer.settings.advanced.model import AdvancedSettingsModel, ClockSource
+from eon_timer.settings.timer.model import TimerBackend, TimerSettingsModel
+from eon_timer.timers import (Calibrator, DelayTimer, EnhancedEntralinkTimer, EntralinkTimer, FrameTimer,
+                              PhaseFactory, SecondTimer, create_plan)
+from eon_timer.timers.custom.model import CustomTimerModel
+from eon_timer.timers.gen3.model import Gen3Model
+from eon_timer.timers.gen4.model import Gen4Model
+from eon_timer.timers.gen5.model import Gen5Model, Gen5Mode
+from eon_timer.util.clock import SOURCES, Clock, measure_sources, pick_source, use_source
+
+BELL: Final[str] = 'bell'
+AUDIO: Final[str] = 'audio'
+NONE: Final[str] = 'none'
+
+
+def main(started_at: Optional[int] = None) -> int:
+    """ Runs a plan without Qt widgets; `started_at` is the perf_counter_ns() at which the script began """
+    started_at = started_at or time.perf_counter_ns()
+    parser = argparse.ArgumentParser(prog='EonTimerCLI')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-a', '--action', choices=[BELL, AUDIO, NONE], default=BELL)
+    common.add_argument('-c', '--count', type=int, help='actions per phase (default: saved setting)')
+    common.add_argument('-i', '--interval', type=int, help='milliseconds between actions (default: saved setting)')
+    common.add_argument('-b', '--backend', choices=[it.value for it in TimerBackend if it != TimerBackend.QT_PRECISE_TIMER])
+    common.add_argument('-n', '--dry-run', action='store_true', help='print the plan without running it')
+    common.add_argument('-v', '--verbose', action='store_true')
+    subparsers = parser.add_subparsers(required=True)
+    # gen3
+    subparser = subparsers.add_parser('gen3', parents=[common], help='Gen 3 frame timer')
+    subparser.add_argument('--pre-timer', type=int)
+    subparser.add_argument('--target-frame', type=int)
+    subparser.add_argument('--calibration', type=float)
+    subparser.set_defaults(model=Gen3Model, create=PhaseFactory.gen3)
+    # gen4
+    subparser = subparsers.add_parser('gen4', parents=[common], help='Gen 4 delay timer')
+    subparser.add_argument('--target-delay', type=int)
+    subparser.add_argument('--target-second', type=int)
+    subparser.add_argument('--calibrated-delay', type=int)
+    subparser.add_argument('--calibrated-second', type=int)
+    subparser.set_defaults(model=Gen4Model, create=PhaseFactory.gen4)
+    # gen5
+    subparser = subparsers.add_parser('gen5', parents=[common], help='Gen 5 timers')
+    subparser.add_argument('--mode', choices=[it.value for it in Gen5Mode])
+    subparser.add_argument('--calibration', type=int)
+    subparser.add_argument('--entralink-calibration', type=int)
+    subparser.add_argument('--frame-calibration', type=int)
+    subparser.add_argument('--target-delay', type=int)
+    subparser.add_argument('--target-second', type=int)
+    subparser.add_argument('--target-advances', type=int)
+    subparser.set_defaults(model=Gen5Model, create=PhaseFactory.gen5)
+    # custom
+    subparser = subparsers.add_parser('custom', parents=[common], help='saved custom phases')
+    subparser.set_defaults(model=CustomTimerModel, create=PhaseFactory.custom)
+    # phases
+    subparser = subparsers.add_parser('phases', parents=[common], help='phase durations given in milliseconds')
+    subparser.add_argument('phases', type=float, nargs='+')
+    subparser.set_defaults(model=None, create=None)
+
+    # parse arguments
+    args = parser.parse_args()
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+    return run_plan(args, started_at)
+
+
+def run_plan(args: argparse.Namespace, started_at: int) -> int:
+    settings = __load_settings()
+    timer_settings = TimerSettingsModel(settings)
+    action_settings = ActionSettingsModel(settings)
+    advanced_settings = AdvancedSettingsModel(settings)
+    # overrides only live for this run: the models are never written back
+    if args.backend is not None:
+        timer_settings.timer_backend.set(TimerBackend(args.backend))
+    if args.count is not None:
+        action_settings.count.set(args.count)
+    if args.interval is not None:
+        action_settings.interval.set(args.interval)
+    if args.model is None:
+        phases = args.phases
+    else:
+        model = args.model(settings)
+        for name, prop in model.properties.items():
+            value = getattr(args, name, None)
+            if value is not None:
+                prop.set(prop.value_type(value))
+        phases = args.create(__create_phase_factory(timer_settings), model)
+    if not phases:
+        print('The plan has no phases', file=sys.stderr)
+        return -1
+    print(f'Phases: {", ".join(f"{phase:.1f}ms" for phase in phases)}')
+    if args.dry_run:
+        __log_startup(started_at)
+        return 0
+
+    timeline = Timeline.compile(create_plan(phases), action_settings.count.get(), action_settings.interval.get())
+    plan = create_run_plan(timeline, timer_settings, advanced_settings)
+    action = __create_action(args.action, action_settings)
+    __select_clock_source(advanced_settings)
+    engine = PhaseEngine()
+    thread = threading.Thread(target=engine.serve, name='EonTimerScheduler', daemon=True)
+    thread.start()
+    listener = _ConsoleListener(action)
+    run = engine.submit(EngineRun(Clock(), plan, listener))
+    __log_startup(started_at)
+    try:
+        # waited on in slices so that Ctrl+C reaches the main thread
+        while not run.finished.wait(0.1):
+            pass
+    except KeyboardInterrupt:
+        run.stop()
+        run.finished.wait()
+    engine.close()
+    thread.join()
+    return 0 if listener.completed else 1
+
+
+class _ConsoleListener(EngineListener):
+    def __init__(self, action: Callable[[], None]):
+        self.action: Final[Callable[[], None]] = action
+        self.completed = False
+        self.__phase_index = 0
+
+    @override
+    def on_realtime_applied(self, report: str):
+        logging.info(f'> INFO: EonTimerCLI#realtime: {report}')
+
+    @override
+    def on_action(self, fired_at: int):
+        self.action()
+
+    @override
+    def on_phase_end(self, phase_start: int, ended_at: int):
+        print(f'Phase {self.__phase_index + 1} ended at {phase_start / 1_000_000:.3f}ms')
+        self.__phase_index += 1
+
+    @override
+    def on_deadline_missed(self, kind: EventKind, lateness: int):
+        print(f'Deadline missed: {kind.name} late by {lateness / 1000:.1f}us', file=sys.stderr)
+
+    @override
+    def on_run_finished(self, stats: RunStats):
+        self.completed = stats.completed
+        stats.log()
+        if not stats.completed:
+            print('Stopped', file=sys.stderr)
+
+
+def __load_settings() -> QSettings:
+    # the same identity EonTimer.py gives its QApplication, so the GUI's saved values are read back
+    QCoreApplication.setApplicationName('EonTimer')
+    QCoreApplication.setOrganizationName('DasAmpharos')
+    QCoreApplication.setOrganizationDomain('io.github.dasampharos')
+    return QSettings()
+
+
+def __create_phase_factory(timer_settings: TimerSettingsModel) -> PhaseFactory:
+    calibrator = Calibrator(timer_settings)
+    second_timer = SecondTimer()
+    delay_timer = DelayTimer(calibrator, second_timer)
+    entralink_timer = EntralinkTimer(delay_timer)
+    return PhaseFactory(calibrator,
+                        FrameTimer(calibrator),
+                        delay_timer,
+                        second_timer,
+                        entralink_timer,
+                        EnhancedEntralinkTimer(entralink_timer))
+
+
+def __select_clock_source(advanced_settings: AdvancedSettingsModel):
+    source = advanced_settings.clock_source.get()
+    if source == ClockSource.AUTO or str(source) not in SOURCES:
+        # only measured when the choice depends on it
+        name = pick_source(measure_sources())
+    else:
+        name = str(source)
+    use_source(name)
+    logging.info(f'> INFO: EonTimerCLI#clock_source: {name}')
+
+
+def __create_action(action: str, action_settings: ActionSettingsModel) -> Callable[[], None]:
+    if action == BELL:
+        def bell():
+            sys.stdout.write('\a')
+            sys.stdout.flush()
+        return bell
+    if action == AUDIO:
+        # pygame is only loaded when it is actually going to be used
+        import pygame.mixer
+        from eon_timer import resources
+        pygame.mixer.init()
+        sound = action_settings.sound.get()
+        if sound == ActionSound.CUSTOM:
+            filepath = action_settings.custom_sound.get()
+        else:
+            filepath = resources.get_filepath(f'sounds/{sound.value.lower()}.wav')
+        return pygame.mixer.Sound(filepath).play
+    return lambda: None
+
+
+def __log_startup(started_at: int):
+    logging.info(f'> INFO: EonTimerCLI#startup: {(time.perf_counter_ns() - started_at) / 1_000_000:.1f}ms')
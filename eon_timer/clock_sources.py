@@ -0,0 +1,72 @@
+import logging
+from typing import Final, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from eon_timer.app_state import AppState
+from eon_timer.settings.advanced.model import AdvancedSettingsModel, ClockSource
+from eon_timer.util.clock import (NANOSECONDS_PER_SECOND, SOURCES, SourceReport, current_source_name, drift_ppm,
+                                  measure_sources, pick_source, sample_sources, use_source)
+from eon_timer.util.injector import component
+
+
+@component()
+class ClockSources(QObject):
+    """
+    Measures every clock source once at startup, selects the one the advanced settings ask for
+    (the finest one on Auto) and compares the sources against each other over long runs.
+    """
+
+    selected: Final[Signal] = Signal(str)
+    # parts per million each source ran ahead of the selected one over the last long run
+    drift_measured: Final[Signal] = Signal(object)
+
+    # over shorter runs the read noise is larger than the drift being measured
+    MIN_DRIFT_INTERVAL: Final[int] = 60 * NANOSECONDS_PER_SECOND
+
+    def __init__(self,
+                 state: AppState,
+                 advanced_settings: AdvancedSettingsModel):
+        super().__init__()
+        self.state: Final[AppState] = state
+        self.advanced_settings: Final[AdvancedSettingsModel] = advanced_settings
+        self.reports: Final[dict[str, SourceReport]] = measure_sources()
+        self.best: Final[str] = pick_source(self.reports)
+        self.drift: dict[str, float] = {}
+        self.__drift_start: Optional[dict[str, int]] = None
+        for report in self.reports.values():
+            logging.info(f'> INFO: ClockSources#measured: {report}')
+        self.__select()
+        advanced_settings.settings_changed.connect(self.__select)
+        state.running_changed.connect(self.__on_running_changed)
+
+    def __select(self):
+        if self.state.running:
+            # the runs in progress keep their source; the new one is picked up once they finish
+            return
+        source = self.advanced_settings.clock_source.get()
+        name = self.best if source == ClockSource.AUTO else str(source)
+        if name not in SOURCES:
+            logging.warning(f'> WARN: ClockSources#select: {name} is not available on this platform, '
+                            f'using {self.best}')
+            name = self.best
+        if name != current_source_name():
+            use_source(name)
+            self.drift = {}
+            logging.info(f'> INFO: ClockSources#select: {name}')
+            self.selected.emit(name)
+
+    def __on_running_changed(self, running: bool):
+        if running:
+            self.__drift_start = sample_sources()
+            return
+        start, self.__drift_start = self.__drift_start, None
+        if start is not None:
+            end = sample_sources()
+            reference = current_source_name()
+            if end[reference] - start[reference] >= self.MIN_DRIFT_INTERVAL:
+                self.drift = drift_ppm(start, end, reference)
+                drift = ', '.join(f'{name}={ppm:+.2f}ppm' for name, ppm in self.drift.items())
+                logging.info(f'> INFO: ClockSources#drift: against {reference}: {drift}')
+                self.drift_measured.emit(self.drift)
+        self.__select()
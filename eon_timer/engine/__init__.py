@@ -0,0 +1 @@
+from .timeline import EventKind, Timeline
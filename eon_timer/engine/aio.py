@@ -0,0 +1,171 @@
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Final, Generator, Optional, Self, override
+
+from eon_timer.util.clock import Clock
+from .engine import Adjustment, EngineListener, EngineRun, PhaseEngine, RunPlan, RunStats
+from .timeline import EventKind
+
+
+@dataclass(frozen=True)
+class EngineEvent:
+    phase_index: int
+
+
+@dataclass(frozen=True)
+class PhaseStarted(EngineEvent):
+    started_at: int
+
+
+@dataclass(frozen=True)
+class ActionFired(EngineEvent):
+    fired_at: int
+
+
+@dataclass(frozen=True)
+class PhaseEnded(EngineEvent):
+    ended_at: int
+
+
+@dataclass(frozen=True)
+class Progress(EngineEvent):
+    phase_elapsed: int
+
+
+@dataclass(frozen=True)
+class DeadlineMissed(EngineEvent):
+    kind: EventKind
+    lateness: int
+
+
+@dataclass(frozen=True)
+class Adjusted(EngineEvent):
+    applied: bool
+
+
+class AsyncRun(EngineListener):
+    """
+    A run on an AsyncEngine. Await it for the run's stats, or iterate it for its events; cancelling
+    the task that does either stops the run. All timestamps are on the engine clock.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, clock: Clock, plan: RunPlan):
+        self.__loop: Final[asyncio.AbstractEventLoop] = loop
+        self.__events: Final[asyncio.Queue[Optional[EngineEvent]]] = asyncio.Queue()
+        self.__stats: Final[asyncio.Future[RunStats]] = loop.create_future()
+        self.__phase_index = 0
+        self.run: Final[EngineRun] = EngineRun(clock, plan, self)
+
+    @property
+    def done(self) -> bool:
+        return self.__stats.done()
+
+    def stop(self):
+        self.run.stop()
+
+    def adjust(self, adjustment: Adjustment):
+        self.run.adjust(adjustment)
+
+    async def wait(self) -> RunStats:
+        try:
+            # shielded, so that a cancelled waiter stops the run instead of losing its result
+            return await asyncio.shield(self.__stats)
+        except asyncio.CancelledError:
+            self.stop()
+            raise
+
+    def __await__(self) -> Generator[None, None, RunStats]:
+        return self.wait().__await__()
+
+    async def __aiter__(self) -> AsyncIterator[EngineEvent]:
+        try:
+            while (event := await self.__events.get()) is not None:
+                yield event
+        except asyncio.CancelledError:
+            self.stop()
+            raise
+
+    # ----- engine thread -----
+    def __post(self, event: Optional[EngineEvent]):
+        self.__call(self.__events.put_nowait, event)
+
+    def __call(self, callback, *args):
+        try:
+            self.__loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # the loop has closed under a run that is still going; nobody is left to tell
+            pass
+
+    @override
+    def on_run_started(self, start_latency: int):
+        self.__post(PhaseStarted(0, self.run.clock.initial_tick))
+
+    @override
+    def on_action(self, fired_at: int):
+        self.__post(ActionFired(self.__phase_index, fired_at))
+
+    @override
+    def on_phase_end(self, phase_start: int, ended_at: int):
+        self.__post(PhaseEnded(self.__phase_index, ended_at))
+        self.__phase_index += 1
+        # the phase end is still the engine's current event; anything after it belongs to the next phase
+        if self.run.index + 1 < self.run.length:
+            # phases start on their deadline, however late the boundary was handled
+            self.__post(PhaseStarted(self.__phase_index, self.run.clock.to_ns(phase_start)))
+
+    @override
+    def on_deadline_missed(self, kind: EventKind, lateness: int):
+        self.__post(DeadlineMissed(self.__phase_index, kind, lateness))
+
+    @override
+    def on_progress(self, phase_elapsed: int):
+        self.__post(Progress(self.__phase_index, phase_elapsed))
+
+    @override
+    def on_adjusted(self, applied: bool):
+        self.__post(Adjusted(self.__phase_index, applied))
+
+    @override
+    def on_run_finished(self, stats: RunStats):
+        self.__post(None)
+        self.__call(self.__finish, stats)
+
+    def __finish(self, stats: RunStats):
+        if not self.__stats.done():
+            self.__stats.set_result(stats)
+
+
+class AsyncEngine:
+    """
+    An asyncio front end to the phase engine. Waiting stays on the engine's own thread, so the
+    event loop's timers never decide when a trigger fires; events are handed to the loop afterward.
+    """
+
+    def __init__(self):
+        self.engine: Final[PhaseEngine] = PhaseEngine()
+        self.__thread: Final[threading.Thread] = threading.Thread(target=self.engine.serve,
+                                                                  name='EonTimerAsyncEngine',
+                                                                  daemon=True)
+        self.__thread.start()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def start(self, plan: RunPlan, start_ns: Optional[int] = None) -> AsyncRun:
+        """ Submits `plan` with t=0 at `start_ns`, or now; must be called from a running event loop """
+        if start_ns is None:
+            start_ns = self.engine.now()
+        run = AsyncRun(asyncio.get_running_loop(), Clock(start_ns, self.engine.now), plan)
+        self.engine.submit(run.run)
+        return run
+
+    async def run(self, plan: RunPlan, start_ns: Optional[int] = None) -> RunStats:
+        return await self.start(plan, start_ns)
+
+    async def close(self):
+        self.engine.close()
+        await asyncio.to_thread(self.__thread.join)
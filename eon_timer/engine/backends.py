@@ -0,0 +1,253 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import sys
+import threading
+import time
+from abc import abstractmethod
+from typing import Callable, Final, override
+
+from PySide6.QtCore import QObject, QThread, QTimer, Qt, Signal
+
+from eon_timer.settings.timer.model import TimerBackend
+
+CLOCK_MONOTONIC: Final[int] = 1
+TIMER_ABSTIME: Final[int] = 1
+TFD_CLOEXEC: Final[int] = 0o2000000
+TFD_TIMER_ABSTIME: Final[int] = 1
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+
+class _Itimerspec(ctypes.Structure):
+    _fields_ = [('it_interval', _Timespec), ('it_value', _Timespec)]
+
+
+def _load_libc() -> ctypes.CDLL:
+    return ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+
+
+def _is_monotonic_perf_counter() -> bool:
+    """ Absolute kernel waits need perf_counter_ns to read CLOCK_MONOTONIC """
+    return (sys.platform.startswith('linux') and
+            time.get_clock_info('perf_counter').implementation == 'clock_gettime(CLOCK_MONOTONIC)')
+
+
+def _reads_clock_monotonic(now: Callable[[], int]) -> bool:
+    if now == time.perf_counter_ns:
+        return _is_monotonic_perf_counter()
+    return (now == time.monotonic_ns and sys.platform.startswith('linux') and
+            time.get_clock_info('monotonic').implementation == 'clock_gettime(CLOCK_MONOTONIC)')
+
+
+class Backend:
+    """ Blocks the calling thread until an absolute deadline on its clock source or until interrupted """
+
+    def __init__(self):
+        self._interrupted: Final[threading.Event] = threading.Event()
+        self._now: Callable[[], int] = time.perf_counter_ns
+        self._native = True
+
+    def use_clock(self, now: Callable[[], int]):
+        """ Sets the time source that deadlines are given in """
+        self._now = now
+        self._native = _reads_clock_monotonic(now)
+
+    def _to_monotonic(self, deadline_ns: int) -> int:
+        """ Kernel waits take CLOCK_MONOTONIC deadlines; other sources are mapped across as the wait begins """
+        if self._native:
+            return deadline_ns
+        return deadline_ns - self._now() + time.monotonic_ns()
+
+    @abstractmethod
+    def wait_until(self, deadline_ns: int) -> bool:
+        """ Returns False if the wait was interrupted before the deadline """
+        ...
+
+    def interrupt(self):
+        self._interrupted.set()
+
+    def reset(self):
+        self._interrupted.clear()
+
+    @property
+    def interrupted(self) -> bool:
+        return self._interrupted.is_set()
+
+    def close(self):
+        pass
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        return True
+
+
+class SleepBackend(Backend):
+    @override
+    def wait_until(self, deadline_ns: int) -> bool:
+        remaining = deadline_ns - self._now()
+        if remaining > 0:
+            return not self._interrupted.wait(remaining / 1_000_000_000)
+        return not self._interrupted.is_set()
+
+
+class ClockNanosleepBackend(Backend):
+    # clock_nanosleep cannot be woken by another thread, so only the last stretch is spent inside it
+    NANOSLEEP_WINDOW: Final[int] = 1_000_000
+
+    def __init__(self):
+        super().__init__()
+        self.__libc: Final[ctypes.CDLL] = _load_libc()
+        self.__request: Final[_Timespec] = _Timespec()
+
+    @override
+    def wait_until(self, deadline_ns: int) -> bool:
+        coarse = deadline_ns - self.NANOSLEEP_WINDOW - self._now()
+        if coarse > 0 and self._interrupted.wait(coarse / 1_000_000_000):
+            return False
+        self.__request.tv_sec, self.__request.tv_nsec = divmod(self._to_monotonic(deadline_ns), 1_000_000_000)
+        request = ctypes.byref(self.__request)
+        # clock_nanosleep returns the error number directly; retry when interrupted by a signal
+        while self.__libc.clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, request, None) == 4:
+            pass
+        return not self._interrupted.is_set()
+
+    @classmethod
+    @override
+    def is_supported(cls) -> bool:
+        return _is_monotonic_perf_counter()
+
+
+class TimerFdBackend(Backend):
+    def __init__(self):
+        super().__init__()
+        self.__libc: Final[ctypes.CDLL] = _load_libc()
+        self.__timer_fd: Final[int] = self.__libc.timerfd_create(CLOCK_MONOTONIC, TFD_CLOEXEC)
+        if self.__timer_fd < 0:
+            raise OSError(ctypes.get_errno(), 'timerfd_create failed')
+        self.__wake_fd: Final[int] = os.eventfd(0, os.EFD_CLOEXEC | os.EFD_NONBLOCK)
+        self.__spec: Final[_Itimerspec] = _Itimerspec()
+        self.__epoll: Final[select.epoll] = select.epoll()
+        self.__epoll.register(self.__timer_fd, select.EPOLLIN)
+        self.__epoll.register(self.__wake_fd, select.EPOLLIN)
+
+    @override
+    def wait_until(self, deadline_ns: int) -> bool:
+        if deadline_ns <= self._now():
+            return not self._interrupted.is_set()
+        value = self.__spec.it_value
+        value.tv_sec, value.tv_nsec = divmod(self._to_monotonic(deadline_ns), 1_000_000_000)
+        self.__libc.timerfd_settime(self.__timer_fd, TFD_TIMER_ABSTIME, ctypes.byref(self.__spec), None)
+        while True:
+            for fd, _ in self.__epoll.poll():
+                if fd == self.__wake_fd:
+                    return False
+                os.read(self.__timer_fd, 8)
+                return True
+
+    @override
+    def interrupt(self):
+        super().interrupt()
+        os.eventfd_write(self.__wake_fd, 1)
+
+    @override
+    def reset(self):
+        super().reset()
+        try:
+            os.eventfd_read(self.__wake_fd)
+        except BlockingIOError:
+            pass
+
+    @override
+    def close(self):
+        self.__epoll.close()
+        os.close(self.__timer_fd)
+        os.close(self.__wake_fd)
+
+    @classmethod
+    @override
+    def is_supported(cls) -> bool:
+        return _is_monotonic_perf_counter() and hasattr(select, 'epoll') and hasattr(os, 'eventfd')
+
+
+class _PreciseTimerWorker(QObject):
+    armed: Final[Signal] = Signal(int)
+    disarmed: Final[Signal] = Signal()
+
+    def __init__(self, fired: threading.Event):
+        super().__init__(None)
+        self.__timer: Final[QTimer] = QTimer(self)
+        self.__timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.__timer.setSingleShot(True)
+        self.__timer.timeout.connect(fired.set)
+        self.armed.connect(self.__timer.start)
+        self.disarmed.connect(self.__timer.stop)
+
+
+class QtPreciseTimerBackend(Backend):
+    """ Waits on a Qt.PreciseTimer that runs on its own event-loop thread """
+
+    def __init__(self):
+        super().__init__()
+        self.__fired: Final[threading.Event] = threading.Event()
+        self.__thread: Final[QThread] = QThread()
+        self.__worker: Final[_PreciseTimerWorker] = _PreciseTimerWorker(self.__fired)
+        self.__worker.moveToThread(self.__thread)
+        # the worker and its timer belong to the thread, so they are torn down on it as it exits
+        self.__thread.finished.connect(self.__worker.deleteLater)
+        self.__thread.start()
+
+    @override
+    def wait_until(self, deadline_ns: int) -> bool:
+        # QTimer only has millisecond granularity, sleep off the sub-millisecond remainder
+        remaining_ms = (deadline_ns - self._now()) // 1_000_000
+        if remaining_ms > 0:
+            self.__fired.clear()
+            # the clear may have swallowed an interrupt that came in after reset()
+            if self._interrupted.is_set():
+                return False
+            self.__worker.armed.emit(remaining_ms)
+            self.__fired.wait()
+            if self._interrupted.is_set():
+                return False
+        remaining = deadline_ns - self._now()
+        if remaining > 0:
+            return not self._interrupted.wait(remaining / 1_000_000_000)
+        return not self._interrupted.is_set()
+
+    @override
+    def interrupt(self):
+        super().interrupt()
+        self.__fired.set()
+
+    @override
+    def close(self):
+        # queued ahead of the quit, so the timer is stopped on its own thread
+        self.__worker.disarmed.emit()
+        self.__thread.quit()
+        self.__thread.wait()
+
+
+def is_backend_supported(backend: TimerBackend) -> bool:
+    return __backend_type(backend).is_supported()
+
+
+def create_backend(backend: TimerBackend) -> Backend:
+    backend_type = __backend_type(backend)
+    if not backend_type.is_supported():
+        logging.warning(f'> WARN: {backend} timer backend is not supported on this platform, using sleep')
+        backend_type = SleepBackend
+    return backend_type()
+
+
+def __backend_type(backend: TimerBackend) -> type[Backend]:
+    return {
+        TimerBackend.SLEEP: SleepBackend,
+        TimerBackend.CLOCK_NANOSLEEP: ClockNanosleepBackend,
+        TimerBackend.TIMERFD: TimerFdBackend,
+        TimerBackend.QT_PRECISE_TIMER: QtPreciseTimerBackend,
+    }.get(backend, SleepBackend)
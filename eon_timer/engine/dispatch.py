@@ -0,0 +1,30 @@
+import statistics
+from collections import deque
+from typing import Final
+
+
+class DispatchLatencyEstimator:
+    """ Rolling estimate of the delay between the engine firing an action and the action executing """
+
+    WINDOW: Final[int] = 32
+    # never issue triggers earlier than this, however badly the main thread is lagging
+    MAX_ESTIMATE: Final[int] = 20_000_000
+
+    def __init__(self):
+        self.__samples: Final[deque[int]] = deque(maxlen=self.WINDOW)
+        self.__estimate: int = 0
+
+    @property
+    def estimate(self) -> int:
+        return self.__estimate
+
+    @property
+    def samples(self) -> int:
+        return len(self.__samples)
+
+    def record(self, latency: int) -> int:
+        """ Adds a sample in nanoseconds and returns the updated estimate """
+        self.__samples.append(max(0, latency))
+        # the median ignores the occasional long stall instead of chasing it
+        self.__estimate = min(int(statistics.median_low(self.__samples)), self.MAX_ESTIMATE)
+        return self.__estimate
@@ -0,0 +1,493 @@
+import heapq
+import logging
+import queue
+import statistics
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Final, Optional
+
+from eon_timer.settings.timer.model import MissPolicy, TimerBackend, WaitPolicy
+from eon_timer.util.clock import Clock, current_source
+from .backends import Backend, create_backend
+from .gc_control import GcControl
+from .realtime import RealtimeSession
+from .timeline import EventKind, Timeline
+
+
+@dataclass(frozen=True)
+class RunPlan:
+    timeline: Timeline
+    backend: TimerBackend
+    wait_policy: WaitPolicy
+    period: int
+    spin_window: int
+    miss_threshold: int
+    miss_policy: MissPolicy
+    realtime: Optional[RealtimeSession]
+    gc_control: Optional[GcControl]
+
+
+@dataclass(frozen=True)
+class Adjustment:
+    """ A change to a run in progress, made against phase `phase_index` """
+    phase_index: int
+    # replaces the current and all later phases; offsets are relative to the start of the current phase
+    timeline: Optional[Timeline] = None
+    # moves every remaining deadline by this many nanoseconds
+    shift: int = 0
+
+
+@dataclass
+class RunStats:
+    completed: bool
+    trigger_errors: array = field(default_factory=lambda: array('q'))
+    gc_collections: int = 0
+    gc_collect_time: int = 0
+    deadline_misses: int = 0
+    wakeups: int = 0
+    cpu_time: int = 0
+    duration: int = 0
+
+    def log(self):
+        if self.trigger_errors:
+            mean = statistics.fmean(self.trigger_errors) / 1000
+            worst = max(self.trigger_errors) / 1000
+            logging.info(f'> INFO: PhaseEngine#trigger_error: mean={mean:.1f}us, max={worst:.1f}us '
+                         f'({len(self.trigger_errors)} actions)')
+        if self.deadline_misses:
+            logging.warning(f'> WARN: PhaseEngine#deadline_misses: {self.deadline_misses}')
+        if self.gc_collections:
+            logging.info(f'> INFO: PhaseEngine#gc: {self.gc_collections} collections '
+                         f'in {self.gc_collect_time / 1000:.1f}us')
+        if self.duration > 0:
+            seconds = self.duration / 1_000_000_000
+            logging.info(f'> INFO: PhaseEngine#wakeups: {self.wakeups} in {seconds:.1f}s '
+                         f'({self.wakeups / seconds:.1f}/s), cpu={self.cpu_time / 1_000_000:.1f}ms '
+                         f'({self.cpu_time / self.duration:.2%})')
+
+
+class EngineListener:
+    """ Receives run events on the engine's thread; all times are integer nanoseconds """
+
+    def on_run_started(self, start_latency: int):
+        """ `start_latency` is how long after t=0 the run actually began; runs may be submitted ahead of t=0 """
+        pass
+
+    def on_realtime_applied(self, report: str):
+        pass
+
+    def on_action(self, fired_at: int):
+        """ `fired_at` is the timestamp on the run's clock at which the engine fired the action """
+        pass
+
+    def on_phase_end(self, phase_start: int, ended_at: int):
+        """
+        `phase_start` is the offset of the phase that just began from the start of the run, and
+        `ended_at` the timestamp on the run's clock at which the engine handled the boundary
+        """
+        pass
+
+    def on_deadline_missed(self, kind: EventKind, lateness: int):
+        pass
+
+    def on_progress(self, phase_elapsed: int):
+        pass
+
+    def on_adjusted(self, applied: bool):
+        """ Answers each adjustment in the order they were made; not `applied` if the run had left its phase """
+        pass
+
+    def on_wake(self, target: int, woke_at: int):
+        """ After every wait the run's deadline decided; `woke_at - target` is the wake-up jitter """
+        pass
+
+    def on_run_finished(self, stats: RunStats):
+        pass
+
+
+class EngineRun:
+    """ One plan being walked by the engine, and the handle callers use to stop or adjust it """
+
+    def __init__(self, clock: Clock, plan: RunPlan, listener: EngineListener):
+        self.clock: Final[Clock] = clock
+        self.plan: Final[RunPlan] = plan
+        self.listener: Final[EngineListener] = listener
+        # set once on_run_finished has returned
+        self.finished: Final[threading.Event] = threading.Event()
+        self.__engine: Optional['PhaseEngine'] = None
+        self.__stopped = False
+        self.__action_lead = 0
+        self.adjustments: Final[queue.SimpleQueue[Adjustment]] = queue.SimpleQueue()
+        # ----- walk state, owned by the engine thread -----
+        timeline = plan.timeline
+        self.times: memoryview = timeline.times
+        self.kinds: memoryview = timeline.kinds
+        self.length: int = len(timeline)
+        # deadlines are `base + times[index]`, so shifting the rest of the run is a single addition
+        self.base: int = 0
+        self.index: int = 0
+        self.phase_index: int = 0
+        self.phase_start: int = 0
+        # false while the run waits for a t=0 that lies in the future
+        self.started: bool = False
+        # bumped whenever the next deadline moves, which invalidates the run's older heap entries
+        self.version: int = 0
+        self.trigger_errors: array = array('q', bytes(8 * timeline.action_count))
+        self.triggered: int = 0
+        self.deadline_misses: int = 0
+        self.wakeups_start: int = 0
+        self.cpu_start: int = 0
+
+    @property
+    def stopped(self) -> bool:
+        return self.__stopped
+
+    @property
+    def action_lead(self) -> int:
+        return self.__action_lead
+
+    @action_lead.setter
+    def action_lead(self, lead: int):
+        """ Fires actions `lead` ns early to absorb dispatch latency; safe to change during a run """
+        self.__action_lead = lead
+
+    def attach(self, engine: 'PhaseEngine'):
+        self.__engine = engine
+
+    def stop(self):
+        """ Ends the run from any thread; `finished` is set once the engine has let go of it """
+        self.__stopped = True
+        if self.__engine is not None:
+            self.__engine.wake()
+
+    def adjust(self, adjustment: Adjustment):
+        """ Re-plans the run from any thread; applied as soon as the engine wakes """
+        self.adjustments.put(adjustment)
+        if self.__engine is not None:
+            self.__engine.wake()
+
+    def next_deadline(self) -> int:
+        """ Absolute deadline of the next event on the run's clock """
+        if not self.started:
+            return self.clock.initial_tick
+        deadline = self.base + self.times[self.index]
+        if self.kinds[self.index] == EventKind.ACTION:
+            deadline -= self.__action_lead
+        return self.clock.to_ns(deadline)
+
+
+class PhaseEngine:
+    """
+    Drives any number of runs from a single thread. The next deadline of every active run sits
+    in a min-heap, so the thread only ever waits for the earliest one, and adding a timer costs
+    a heap entry rather than a thread. Independent of Qt.
+    """
+
+    # the longest single wait under the adaptive policy
+    MAX_ADAPTIVE_WAIT: Final[int] = 1_000_000_000
+
+    def __init__(self, now: Optional[Callable[[], int]] = None, backend: Optional[Backend] = None):
+        """
+        `now` and `backend` are the engine's clock and sleeper. They default to the selected clock source,
+        taken up again at the start of every busy period, and a backend picked per plan; a virtual clock
+        and its backend make the engine run in simulated time.
+        """
+        self.__fixed_clock: Final[bool] = now is not None
+        self.__now: Callable[[], int] = now or current_source()
+        self.__fixed_backend: Final[bool] = backend is not None
+        self.__backend: Optional[Backend] = backend
+        self.__backend_type: Optional[TimerBackend] = None
+        self.__inbox: Final[queue.SimpleQueue[Optional[EngineRun]]] = queue.SimpleQueue()
+        self.__active: Final[list[EngineRun]] = []
+        self.__heap: Final[list[tuple[int, int, int, EngineRun]]] = []
+        self.__sequence = 0
+        self.__wakeups = 0
+        self.__realtime: Optional[RealtimeSession] = None
+        self.__gc_control: Optional[GcControl] = None
+
+    @property
+    def now(self) -> Callable[[], int]:
+        """ The source that runs submitted next should be clocked on """
+        return self.__now if self.__fixed_clock else current_source()
+
+    def submit(self, run: EngineRun) -> EngineRun:
+        """ Hands a run to the engine thread from any thread """
+        run.attach(self)
+        self.__inbox.put(run)
+        self.wake()
+        return run
+
+    def wake(self):
+        backend = self.__backend
+        if backend is not None:
+            backend.interrupt()
+
+    def stop(self):
+        for run in list(self.__active):
+            run.stop()
+
+    def close(self):
+        """ Stops every run and makes serve() return """
+        self.stop()
+        # serve() only closes the backend after it takes the sentinel, so every wake lands first
+        self.wake()
+        self.__inbox.put(None)
+
+    def serve(self, until_idle: bool = False):
+        """ The scheduler loop; runs on the calling thread until close(), or until no work is left with `until_idle` """
+        heap = self.__heap
+        active = self.__active
+        inbox = self.__inbox
+        closing = False
+        while not closing:
+            if not active:
+                self.__on_idle()
+                if until_idle and inbox.empty():
+                    break
+                # parked: no timers, no wakeups
+                run = inbox.get()
+                if run is None:
+                    break
+                self.__admit(run)
+            # clear the interrupt before looking for work, so a request that arrives after
+            # the checks below still cuts the next wait short
+            backend = self.__backend
+            backend.reset()
+            while not inbox.empty():
+                run = inbox.get_nowait()
+                if run is None:
+                    closing = True
+                    break
+                self.__admit(run)
+            for run in list(active):
+                if run.stopped:
+                    self.__finish(run, False)
+                elif not run.adjustments.empty():
+                    self.__apply_adjustments(run)
+            self.__drop_stale_entries()
+            if closing or not heap:
+                continue
+
+            deadline_ns, _, _, run = heap[0]
+            plan = run.plan
+            period = plan.period
+            now = self.__now()
+            remaining = deadline_ns - now
+            if remaining < period:
+                target = deadline_ns
+                self.__wait_until(backend, target, plan.spin_window)
+            elif plan.wait_policy == WaitPolicy.ADAPTIVE:
+                # halve the distance each time, so a long phase costs about one wakeup a second
+                # and the waits only tighten to `period` as the next event gets close
+                target = now + min(max(remaining // 2, period), self.MAX_ADAPTIVE_WAIT)
+                self.__wait_until(backend, target, 0)
+            else:
+                target = now + period
+                self.__wait_until(backend, target, 0)
+            if backend.interrupted:
+                # a submit, stop, adjustment or close; handled at the top of the loop
+                continue
+
+            self.__wakeups += 1
+            now = self.__now()
+            run.listener.on_wake(target, now)
+            if now < deadline_ns:
+                run.listener.on_progress(run.clock.elapsed_ns() - run.phase_start)
+                continue
+            # every run with a due event fires it, earliest first, each against a fresh timestamp
+            # so that one run's listeners do not hide the lateness they cause the next
+            while heap and heap[0][0] <= now:
+                _, _, version, run = heapq.heappop(heap)
+                if not run.finished.is_set() and version == run.version:
+                    self.__fire_due(run, now)
+                now = self.__now()
+        for run in list(active):
+            self.__finish(run, False)
+        self.__on_idle()
+        # a backend handed in by the caller stays open for the next serve()
+        if not self.__fixed_backend and self.__backend is not None:
+            backend, self.__backend = self.__backend, None
+            backend.close()
+
+    def __admit(self, run: EngineRun):
+        plan = run.plan
+        if not self.__active:
+            # the clock, backend, realtime policy and gc control follow the first run of a busy period
+            self.__now = run.clock.source
+            if not self.__fixed_backend:
+                if self.__backend is None or plan.backend != self.__backend_type:
+                    if self.__backend is not None:
+                        self.__backend.close()
+                    self.__backend = create_backend(plan.backend)
+                    self.__backend_type = plan.backend
+                self.__backend.use_clock(self.__now)
+            if plan.realtime is not None:
+                self.__realtime = plan.realtime
+                run.listener.on_realtime_applied(str(plan.realtime.apply()))
+            if plan.gc_control is not None:
+                self.__gc_control = plan.gc_control
+                self.__gc_control.begin()
+        elif run.clock.source != self.__now:
+            # deadlines on two sources cannot share a heap; the source only changes between runs
+            logging.warning('> WARN: PhaseEngine#admit: run is not on the clock source of the runs in progress')
+            run.stop()
+        else:
+            self.__warn_if_not_shared(plan)
+        start_latency = run.clock.elapsed_ns()
+        if start_latency >= 0:
+            run.started = True
+            run.listener.on_run_started(start_latency)
+        run.wakeups_start = self.__wakeups
+        run.cpu_start = time.thread_time_ns()
+        self.__active.append(run)
+        if run.stopped or run.length == 0:
+            self.__finish(run, not run.stopped)
+        else:
+            self.__schedule(run)
+
+    def __warn_if_not_shared(self, plan: RunPlan):
+        """ Runs that join a busy period share its backend, realtime policy and gc control """
+        differences = []
+        if not self.__fixed_backend and plan.backend != self.__backend_type:
+            differences.append(f'backend {self.__backend_type} instead of {plan.backend}')
+        realtime = self.__realtime.config if self.__realtime is not None else None
+        if (plan.realtime.config if plan.realtime is not None else None) != realtime:
+            differences.append('the realtime policy of the runs in progress')
+        if (plan.gc_control is None) != (self.__gc_control is None):
+            differences.append('the gc control of the runs in progress')
+        if differences:
+            logging.warning(f'> WARN: PhaseEngine#admit: run joins a busy period and uses {", ".join(differences)}; '
+                            f'its own settings apply once the runs in progress have finished')
+
+    def __schedule(self, run: EngineRun):
+        run.version += 1
+        self.__sequence += 1
+        heapq.heappush(self.__heap, (run.next_deadline(), self.__sequence, run.version, run))
+
+    def __apply_adjustments(self, run: EngineRun):
+        while not run.adjustments.empty():
+            adjustment = run.adjustments.get_nowait()
+            if adjustment.phase_index != run.phase_index:
+                logging.warning(f'> WARN: PhaseEngine#adjust: made for phase {adjustment.phase_index}, '
+                                f'run is in phase {run.phase_index}')
+                run.listener.on_adjusted(False)
+                continue
+            if adjustment.timeline is not None:
+                # the new phases continue from where the current one actually started
+                timeline = adjustment.timeline
+                run.times = timeline.times
+                run.kinds = timeline.kinds
+                run.length = len(timeline)
+                run.base = run.phase_start
+                run.index = 0
+                capacity = run.triggered + timeline.action_count
+                if capacity > len(run.trigger_errors):
+                    run.trigger_errors.extend(array('q', bytes(8 * (capacity - len(run.trigger_errors)))))
+            run.base += adjustment.shift
+            run.listener.on_adjusted(True)
+            # actions that are already behind us are dropped rather than fired late
+            elapsed = run.clock.elapsed_ns()
+            while (run.index < run.length and run.kinds[run.index] == EventKind.ACTION
+                   and run.base + run.times[run.index] <= elapsed):
+                run.index += 1
+        if run.index == run.length:
+            self.__finish(run, True)
+        else:
+            self.__schedule(run)
+
+    def __fire_due(self, run: EngineRun, now: int):
+        listener = run.listener
+        plan = run.plan
+        miss_threshold = plan.miss_threshold
+        miss_policy = plan.miss_policy
+        action_lead = run.action_lead
+        times = run.times
+        kinds = run.kinds
+        elapsed = now - run.clock.initial_tick
+        if not run.started:
+            # a deferred start is an event like any other, so t=0 gets the same precise wait
+            run.started = True
+            listener.on_run_started(elapsed)
+        while run.index < run.length:
+            index = run.index
+            kind = kinds[index]
+            deadline = run.base + times[index]
+            if kind == EventKind.ACTION:
+                deadline -= action_lead
+            if elapsed < deadline:
+                break
+            lateness = elapsed - deadline
+            missed = lateness > miss_threshold
+            if missed:
+                run.deadline_misses += 1
+                listener.on_deadline_missed(EventKind(kind), lateness)
+                if miss_policy == MissPolicy.ABORT:
+                    self.__finish(run, False)
+                    return
+            if kind == EventKind.ACTION:
+                # a stale beep is worse than none when the player is counting on the rhythm
+                if not missed or miss_policy != MissPolicy.SKIP:
+                    listener.on_action(run.clock.to_ns(elapsed))
+                    run.trigger_errors[run.triggered] = lateness
+                    run.triggered += 1
+            else:
+                run.phase_index += 1
+                run.phase_start = deadline
+                listener.on_phase_end(deadline, run.clock.to_ns(elapsed))
+            run.index += 1
+        if run.index == run.length:
+            self.__finish(run, True)
+            return
+        self.__schedule(run)
+        if kinds[run.index - 1] == EventKind.PHASE_END and self.__gc_control is not None:
+            # the top of the heap may be an entry left behind by a run that has since moved on,
+            # so the collection is bounded by the run's own next event, or another run's if sooner
+            deadline = run.next_deadline()
+            self.__drop_stale_entries()
+            self.__gc_control.collect(min(deadline, self.__heap[0][0]) - self.__now())
+
+    def __drop_stale_entries(self):
+        """ Pops entries of finished runs, and of deadlines that have since moved, off the top of the heap """
+        heap = self.__heap
+        while heap and (heap[0][3].finished.is_set() or heap[0][2] != heap[0][3].version):
+            heapq.heappop(heap)
+
+    def __finish(self, run: EngineRun, completed: bool):
+        if run.finished.is_set():
+            return
+        self.__active.remove(run)
+        duration = run.clock.elapsed_ns()
+        trigger_errors = run.trigger_errors
+        del trigger_errors[run.triggered:]
+        stats = RunStats(completed, trigger_errors)
+        stats.deadline_misses = run.deadline_misses
+        stats.wakeups = self.__wakeups - run.wakeups_start
+        stats.cpu_time = time.thread_time_ns() - run.cpu_start
+        stats.duration = duration
+        gc_control = self.__gc_control
+        if gc_control is not None:
+            stats.gc_collections = gc_control.collections
+            stats.gc_collect_time = gc_control.collect_time
+        # the handle is released first, so the listener may submit a follow-up run right away
+        run.version += 1
+        try:
+            run.listener.on_run_finished(stats)
+        finally:
+            run.finished.set()
+
+    def __on_idle(self):
+        if self.__gc_control is not None:
+            self.__gc_control.end()
+            self.__gc_control = None
+        if self.__realtime is not None:
+            self.__realtime.restore()
+            self.__realtime = None
+
+    def __wait_until(self, backend: Backend, deadline_ns: int, spin_window: int):
+        """ Waits on the backend until `spin_window` ns before the deadline, then busy-waits for the remainder """
+        if backend.wait_until(deadline_ns - spin_window):
+            now = self.__now
+            while now() < deadline_ns and not backend.interrupted:
+                pass
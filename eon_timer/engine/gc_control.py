@@ -0,0 +1,33 @@
+import gc
+import time
+from typing import Final
+
+
+class GcControl:
+    """ Keeps the cyclic garbage collector from pausing the process in the middle of a run """
+
+    # only collect between phases when the next event is at least this many nanoseconds away
+    COLLECT_MARGIN: Final[int] = 50_000_000
+
+    def __init__(self):
+        self.__was_enabled = False
+        self.collections: int = 0
+        self.collect_time: int = 0
+
+    def begin(self):
+        self.__was_enabled = gc.isenabled()
+        self.collections = 0
+        self.collect_time = 0
+        gc.disable()
+
+    def collect(self, time_until_next_event: int):
+        """ Runs a bounded, youngest-generation-only collection if there is time for it """
+        if time_until_next_event >= self.COLLECT_MARGIN:
+            start = time.perf_counter_ns()
+            gc.collect(0)
+            self.collect_time += time.perf_counter_ns() - start
+            self.collections += 1
+
+    def end(self):
+        if self.__was_enabled:
+            gc.enable()
@@ -0,0 +1,131 @@
+import ctypes
+import ctypes.util
+import os
+from dataclasses import dataclass, field
+from typing import Final, Optional
+
+from eon_timer.settings.advanced.model import RealtimePolicy
+
+PR_SET_TIMERSLACK: Final[int] = 29
+PR_GET_TIMERSLACK: Final[int] = 30
+MCL_CURRENT: Final[int] = 1
+MCL_FUTURE: Final[int] = 2
+
+
+@dataclass
+class RealtimeConfig:
+    policy: RealtimePolicy
+    priority: int
+    cpus: set[int]
+    lock_memory: bool
+
+
+@dataclass
+class RealtimeReport:
+    applied: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        parts = [f'{it}: ok' for it in self.applied]
+        parts.extend(f'{it}: failed' for it in self.failed)
+        return ', '.join(parts) or 'inactive'
+
+
+class RealtimeSession:
+    """
+    Applies real-time scheduling options to the calling thread and restores them afterwards.
+    Every option degrades gracefully when the platform or the user's privileges do not allow it.
+    """
+
+    def __init__(self, config: RealtimeConfig):
+        self.config: Final[RealtimeConfig] = config
+        self.__libc: Optional[ctypes.CDLL] = None
+        self.__scheduler: Optional[tuple[int, os.sched_param]] = None
+        self.__affinity: Optional[set[int]] = None
+        self.__timer_slack: Optional[int] = None
+        self.__memory_locked = False
+
+    def apply(self) -> RealtimeReport:
+        report = RealtimeReport()
+        self.__libc = self.__load_libc()
+        self.__apply_scheduler(report)
+        self.__apply_affinity(report)
+        self.__apply_timer_slack(report)
+        if self.config.lock_memory:
+            self.__apply_memory_lock(report)
+        return report
+
+    def restore(self):
+        if self.__scheduler is not None:
+            policy, param = self.__scheduler
+            os.sched_setscheduler(0, policy, param)
+            self.__scheduler = None
+        if self.__affinity is not None:
+            os.sched_setaffinity(0, self.__affinity)
+            self.__affinity = None
+        if self.__timer_slack is not None:
+            self.__libc.prctl(PR_SET_TIMERSLACK, ctypes.c_ulong(self.__timer_slack), 0, 0, 0)
+            self.__timer_slack = None
+        if self.__memory_locked:
+            self.__libc.munlockall()
+            self.__memory_locked = False
+
+    def __apply_scheduler(self, report: RealtimeReport):
+        name = str(self.config.policy)
+        if not hasattr(os, 'sched_setscheduler'):
+            report.failed.append(name)
+            return
+        policy = os.SCHED_RR if self.config.policy == RealtimePolicy.RR else os.SCHED_FIFO
+        priority = max(os.sched_get_priority_min(policy),
+                       min(self.config.priority, os.sched_get_priority_max(policy)))
+        previous = (os.sched_getscheduler(0), os.sched_getparam(0))
+        try:
+            os.sched_setscheduler(0, policy, os.sched_param(priority))
+            self.__scheduler = previous
+            report.applied.append(f'{name}({priority})')
+        except PermissionError:
+            report.failed.append(name)
+
+    def __apply_affinity(self, report: RealtimeReport):
+        if not self.config.cpus:
+            return
+        name = f'affinity{sorted(self.config.cpus)}'
+        if not hasattr(os, 'sched_setaffinity'):
+            report.failed.append(name)
+            return
+        previous = os.sched_getaffinity(0)
+        try:
+            os.sched_setaffinity(0, self.config.cpus)
+            self.__affinity = previous
+            report.applied.append(name)
+        except OSError:
+            report.failed.append(name)
+
+    def __apply_timer_slack(self, report: RealtimeReport):
+        if self.__libc is None or not hasattr(self.__libc, 'prctl'):
+            report.failed.append('timerslack')
+            return
+        previous = self.__libc.prctl(PR_GET_TIMERSLACK, 0, 0, 0, 0)
+        if previous >= 0 and self.__libc.prctl(PR_SET_TIMERSLACK, ctypes.c_ulong(1), 0, 0, 0) == 0:
+            self.__timer_slack = previous
+            report.applied.append('timerslack')
+        else:
+            report.failed.append('timerslack')
+
+    def __apply_memory_lock(self, report: RealtimeReport):
+        if self.__libc is not None and hasattr(self.__libc, 'mlockall'):
+            if self.__libc.mlockall(MCL_CURRENT | MCL_FUTURE) == 0:
+                self.__memory_locked = True
+                report.applied.append('mlockall')
+                return
+        report.failed.append('mlockall')
+
+    @staticmethod
+    def __load_libc() -> Optional[ctypes.CDLL]:
+        library = ctypes.util.find_library('c')
+        if library is None or os.name != 'posix':
+            return None
+        try:
+            return ctypes.CDLL(library, use_errno=True)
+        except OSError:
+            return None
@@ -0,0 +1,156 @@
+import dataclasses
+import logging
+import multiprocessing
+import threading
+from multiprocessing.connection import Connection
+from typing import Final, Optional, override
+
+from eon_timer.settings.timer.model import TimerBackend
+from eon_timer.util.clock import Clock, current_source_name, use_source
+from .engine import Adjustment, EngineListener, EngineRun, PhaseEngine, RunPlan, RunStats
+from .timeline import EventKind
+
+
+class _PipeListener(EngineListener):
+    """ Forwards engine events from the engine process to the GUI process """
+
+    def __init__(self, events: Connection):
+        self.events: Final[Connection] = events
+
+    @override
+    def on_run_started(self, start_latency: int):
+        self.events.send(('run_started', start_latency))
+
+    @override
+    def on_realtime_applied(self, report: str):
+        self.events.send(('realtime_applied', report))
+
+    @override
+    def on_action(self, fired_at: int):
+        self.events.send(('action', fired_at))
+
+    @override
+    def on_phase_end(self, phase_start: int, ended_at: int):
+        self.events.send(('phase_end', phase_start, ended_at))
+
+    @override
+    def on_deadline_missed(self, kind: EventKind, lateness: int):
+        self.events.send(('deadline_missed', kind, lateness))
+
+    @override
+    def on_adjusted(self, applied: bool):
+        self.events.send(('adjusted', applied))
+
+    @override
+    def on_run_finished(self, stats: RunStats):
+        self.events.send(('run_finished', stats))
+
+
+def _engine_main(commands: Connection, events: Connection):
+    engine = PhaseEngine()
+    listener = _PipeListener(events)
+    scheduler = threading.Thread(target=engine.serve, name='EonTimerScheduler')
+    scheduler.start()
+    run: Optional[EngineRun] = None
+    action_lead = 0
+    while True:
+        command, *args = commands.recv()
+        if command == 'run':
+            start_ns, plan, source = args
+            # t=0 was read on the GUI process's source; every source here is system-wide
+            use_source(source)
+            if plan.backend == TimerBackend.QT_PRECISE_TIMER:
+                # there is no Qt application in the engine process
+                plan = dataclasses.replace(plan, backend=TimerBackend.CLOCK_NANOSLEEP)
+            run = EngineRun(Clock(start_ns), plan, listener)
+            run.action_lead = action_lead
+            engine.submit(run)
+        elif command == 'stop':
+            if run is not None:
+                run.stop()
+        elif command == 'adjust':
+            if run is not None:
+                run.adjust(args[0])
+        elif command == 'action_lead':
+            action_lead = args[0]
+            if run is not None:
+                run.action_lead = action_lead
+        elif command == 'exit':
+            break
+    engine.close()
+    scheduler.join()
+
+
+class RemoteEngine:
+    """
+    Runs the phase engine in a separate process so that the GUI's GIL contention cannot
+    delay triggers. Commands and events both cross pipes, and there is no shared-memory state:
+    the GUI only needs the phase index and when the phase started, which change at phase ends
+    and arrive as events, while elapsed and remaining time are computed from the clock on read.
+    """
+
+    def __init__(self, listener: EngineListener):
+        self.listener: Final[EngineListener] = listener
+        self.__idle: Final[threading.Event] = threading.Event()
+        self.__idle.set()
+        context = multiprocessing.get_context('spawn')
+        commands_reader, self.__commands = context.Pipe(duplex=False)
+        self.__events, events_writer = context.Pipe(duplex=False)
+        self.__process: Final = context.Process(target=_engine_main,
+                                                args=(commands_reader, events_writer),
+                                                name='EonTimerEngine',
+                                                daemon=True)
+        self.__process.start()
+        self.__relay: Final[threading.Thread] = threading.Thread(target=self.__relay_events,
+                                                                 name='EonTimerEngineRelay',
+                                                                 daemon=True)
+        self.__relay.start()
+
+    def start(self, start_ns: int, plan: RunPlan):
+        self.__idle.clear()
+        self.__commands.send(('run', start_ns, plan, current_source_name()))
+
+    def adjust(self, adjustment: Adjustment):
+        self.__commands.send(('adjust', adjustment))
+
+    def set_action_lead(self, lead: int):
+        self.__commands.send(('action_lead', lead))
+
+    def stop(self):
+        self.__commands.send(('stop',))
+        self.__idle.wait(timeout=1)
+
+    def close(self):
+        if self.__process.is_alive():
+            self.__commands.send(('exit',))
+            self.__process.join(timeout=1)
+
+    def __relay_events(self):
+        # only discrete events cross the pipe; AppState computes the progress between them on read
+        while True:
+            try:
+                event, *args = self.__events.recv()
+            except (EOFError, OSError):
+                break
+            self.__dispatch(event, args)
+
+    def __dispatch(self, event: str, args: list):
+        match event:
+            case 'run_started':
+                self.listener.on_run_started(*args)
+            case 'realtime_applied':
+                self.listener.on_realtime_applied(*args)
+            case 'action':
+                self.listener.on_action(*args)
+            case 'deadline_missed':
+                self.listener.on_deadline_missed(*args)
+            case 'phase_end':
+                self.listener.on_phase_end(*args)
+            case 'adjusted':
+                self.listener.on_adjusted(*args)
+            case 'run_finished':
+                # marked idle first, so that the listener may chain the next run from here
+                self.__idle.set()
+                self.listener.on_run_finished(*args)
+            case _:
+                logging.warning(f'> WARN: RemoteEngine: unknown event {event}')
@@ -0,0 +1,37 @@
+from typing import Optional
+
+from eon_timer.settings.advanced.model import AdvancedSettingsModel
+from eon_timer.settings.timer.model import FinalWaitMode, MAX_SPIN_WINDOW, TimerSettingsModel
+from eon_timer.timers.plan import NANOSECONDS_PER_MILLISECOND
+from .engine import RunPlan
+from .gc_control import GcControl
+from .realtime import RealtimeConfig, RealtimeSession
+from .timeline import Timeline
+
+
+def create_run_plan(timeline: Timeline,
+                    timer_settings: TimerSettingsModel,
+                    advanced_settings: AdvancedSettingsModel) -> RunPlan:
+    """ Pairs a compiled timeline with how the saved settings say it should be waited on """
+    spin_window = 0
+    if timer_settings.final_wait.get() == FinalWaitMode.HYBRID:
+        spin_window = min(timer_settings.spin_window.get(), MAX_SPIN_WINDOW)
+    gc_control = GcControl() if advanced_settings.gc_control.get() else None
+    return RunPlan(timeline,
+                   timer_settings.timer_backend.get(),
+                   timer_settings.wait_policy.get(),
+                   timer_settings.refresh_interval.get() * NANOSECONDS_PER_MILLISECOND,
+                   spin_window * NANOSECONDS_PER_MILLISECOND,
+                   timer_settings.miss_threshold.get() * NANOSECONDS_PER_MILLISECOND,
+                   timer_settings.miss_policy.get(),
+                   create_realtime_session(advanced_settings),
+                   gc_control)
+
+
+def create_realtime_session(advanced_settings: AdvancedSettingsModel) -> Optional[RealtimeSession]:
+    if not advanced_settings.realtime.get():
+        return None
+    return RealtimeSession(RealtimeConfig(advanced_settings.realtime_policy.get(),
+                                          advanced_settings.realtime_priority.get(),
+                                          advanced_settings.cpus,
+                                          advanced_settings.lock_memory.get()))
@@ -0,0 +1,57 @@
+from array import array
+from enum import IntEnum
+from typing import Final, Self
+
+from eon_timer.timers.plan import NANOSECONDS_PER_MILLISECOND, Plan
+
+
+class EventKind(IntEnum):
+    ACTION = 0
+    PHASE_END = 1
+
+
+class Timeline:
+    """ Immutable, array-backed list of run events sorted by their offset in nanoseconds from the start of the run """
+
+    def __init__(self, times: array, kinds: array, phases: Plan):
+        self.__times: Final[array] = times
+        self.__kinds: Final[array] = kinds
+        self.phases: Final[Plan] = phases
+        self.action_count: Final[int] = kinds.count(EventKind.ACTION)
+
+    @classmethod
+    def compile(cls,
+                phases: Plan,
+                action_count: int,
+                action_interval: int) -> Self:
+        """ Compiles a plan with actions every `action_interval` milliseconds before each phase end """
+        if any(phase < 0 for phase in phases):
+            raise ValueError(f'phases must not be negative: {phases}')
+        interval = action_interval * NANOSECONDS_PER_MILLISECOND
+        # offsets before each phase end, the earliest first
+        offsets = [interval * i for i in reversed(range(action_count))]
+        events: list[tuple[int, int]] = []
+        phase_start = 0
+        for phase in phases:
+            phase_end = phase_start + phase
+            for offset in offsets:
+                if offset < phase:
+                    events.append((phase_end - offset, EventKind.ACTION))
+            events.append((phase_end, EventKind.PHASE_END))
+            phase_start = phase_end
+        # stable sort keeps actions ahead of a phase end at the same offset
+        events.sort(key=lambda it: it[0])
+        times = array('q', (event[0] for event in events))
+        kinds = array('B', (event[1] for event in events))
+        return cls(times, kinds, tuple(phases))
+
+    def __len__(self) -> int:
+        return len(self.__times)
+
+    @property
+    def times(self) -> memoryview:
+        return memoryview(self.__times).toreadonly()
+
+    @property
+    def kinds(self) -> memoryview:
+        return memoryview(self.__kinds).toreadonly()
@@ -0,0 +1,119 @@
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Final, Iterator, Sequence
+
+import platformdirs
+
+TRACE_EXTENSION: Final[str] = '.eontrace'
+RECORD_FIELDS: Final[int] = 4
+# magic, version, fields per record, records, records dropped from the front, t=0
+_HEADER: Final[struct.Struct] = struct.Struct('<4sHHIIq')
+_MAGIC: Final[bytes] = b'EONT'
+_VERSION: Final[int] = 1
+
+
+class TraceKind(IntEnum):
+    # a return from a wait; value is how late the wake was against the wait's target
+    WAKE = 0
+    # a fired action; value is its trigger error
+    ACTION = 1
+    # a phase boundary; value is how late it was handled
+    PHASE_END = 2
+
+
+@dataclass(frozen=True)
+class Trace:
+    start_ns: int
+    dropped: int
+    # (kind, phase_index, time, value) per record, flattened, oldest first
+    records: array
+
+    def __len__(self) -> int:
+        return len(self.records) // RECORD_FIELDS
+
+    def __iter__(self) -> Iterator[tuple[int, int, int, int]]:
+        records = self.records
+        for i in range(0, len(records), RECORD_FIELDS):
+            yield records[i], records[i + 1], records[i + 2], records[i + 3]
+
+    def write(self, path: str):
+        records = self.records
+        if sys.byteorder != 'little':
+            records = array('q', records)
+            records.byteswap()
+        with open(path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, RECORD_FIELDS, len(self), self.dropped, self.start_ns))
+            records.tofile(file)
+
+    @classmethod
+    def read(cls, path: str) -> 'Trace':
+        with open(path, 'rb') as file:
+            magic, version, fields, count, dropped, start_ns = _HEADER.unpack(file.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION or fields != RECORD_FIELDS:
+                raise ValueError(f'{path} is not a version {_VERSION} trace')
+            records = array('q')
+            records.fromfile(file, count * fields)
+        if sys.byteorder != 'little':
+            records.byteswap()
+        return Trace(start_ns, dropped, records)
+
+
+class TraceRecorder:
+    """
+    A ring of (kind, phase_index, time, value) records in one preallocated array, so recording
+    allocates nothing. Once full, the oldest records are overwritten.
+    """
+
+    def __init__(self, capacity: int = 65_536):
+        self.capacity: Final[int] = capacity
+        self.__records: Final[array] = array('q', bytes(8 * RECORD_FIELDS * capacity))
+        self.__written = 0
+
+    def reset(self):
+        self.__written = 0
+
+    def record(self, kind: TraceKind, phase_index: int, time: int, value: int):
+        i = self.__written % self.capacity * RECORD_FIELDS
+        records = self.__records
+        records[i] = kind
+        records[i + 1] = phase_index
+        records[i + 2] = time
+        records[i + 3] = value
+        self.__written += 1
+
+    def fill(self, kind: TraceKind, values: Sequence[int]):
+        """ Sets the values of the latest records of `kind` from `values`, last to last """
+        records = self.__records
+        remaining = len(values)
+        for n in range(min(self.__written, self.capacity)):
+            if remaining == 0:
+                break
+            i = (self.__written - 1 - n) % self.capacity * RECORD_FIELDS
+            if records[i] == kind:
+                remaining -= 1
+                records[i + 3] = values[remaining]
+
+    def snapshot(self, start_ns: int) -> Trace:
+        """ Copies the records out, oldest first """
+        written = self.__written
+        if written <= self.capacity:
+            records = self.__records[:written * RECORD_FIELDS]
+        else:
+            split = written % self.capacity * RECORD_FIELDS
+            records = self.__records[split:] + self.__records[:split]
+        return Trace(start_ns, max(0, written - self.capacity), records)
+
+
+def trace_dir(app_name: str, author: str) -> str:
+    """ Where runs are traced to, next to the installed themes """
+    return os.path.join(platformdirs.user_data_dir(appname=app_name, appauthor=author), 'traces')
+
+
+def list_traces(directory: str) -> list[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(TRACE_EXTENSION))
@@ -1,87 +1,363 @@
-import functools
+import collections
+import logging
+import os
+import queue
+import threading
 import time
-from typing import Optional, Final, Iterator
+from typing import Optional, Final, Sequence, override
 
-from PySide6.QtCore import QObject
+from PySide6.QtCore import QCoreApplication, QObject, Signal
 
 from eon_timer.app_state import AppState
+from eon_timer.engine import EventKind, Timeline
+from eon_timer.engine.dispatch import DispatchLatencyEstimator
+from eon_timer.engine.engine import Adjustment, EngineListener, EngineRun, RunPlan, RunStats
+from eon_timer.engine.remote import RemoteEngine
+from eon_timer.engine.run_plan import create_run_plan
+from eon_timer.engine.trace import TRACE_EXTENSION, TraceKind, TraceRecorder, trace_dir
 from eon_timer.settings.action.model import ActionSettingsModel
+from eon_timer.settings.advanced.model import AdvancedSettingsModel
+from eon_timer.scheduler import Scheduler
 from eon_timer.settings.timer.model import TimerSettingsModel
-from eon_timer.util.clock import Clock
+from eon_timer.timers.plan import NANOSECONDS_PER_MILLISECOND, Plan
+from eon_timer.util.clock import NANOSECONDS_PER_SECOND, Clock, next_second_boundary
 from eon_timer.util.injector import component
-from eon_timer.util.pyside.thread import DelegatingQThread
+from eon_timer.util.injector.lifecycle import CloseListener, StartListener
 
 
 @component()
-class PhaseRunner(QObject):
+class PhaseRunner(QObject, StartListener, CloseListener, EngineListener):
+    """
+    One timer instance: its own phases, settings and run. Any number of instances can share a
+    Scheduler, which drives all of their in-process runs from a single thread.
+    """
+
+    realtime_applied: Final[Signal] = Signal(str)
+    start_latency_measured: Final[Signal] = Signal(object)
+    dispatch_latency_estimated: Final[Signal] = Signal(object)
+
+    # the soonest an aligned start may be, so the plan is handed over before t=0
+    ALIGNMENT_MARGIN: Final[int] = 20 * NANOSECONDS_PER_MILLISECOND
+    # the furthest latency compensation pulls an action forward; a main thread lagging by more
+    # than this is a stall to fix, not a delay to fire around
+    MAX_ACTION_LEAD: Final[int] = 4 * NANOSECONDS_PER_MILLISECOND
+
     def __init__(self,
                  state: AppState,
                  timer_settings: TimerSettingsModel,
-                 action_settings: ActionSettingsModel):
+                 action_settings: ActionSettingsModel,
+                 advanced_settings: AdvancedSettingsModel,
+                 scheduler: Scheduler):
         super().__init__()
         self.state: Final[AppState] = state
         self.timer_settings: Final[TimerSettingsModel] = timer_settings
         self.action_settings: Final[ActionSettingsModel] = action_settings
-        self.__thread: Optional[DelegatingQThread] = None
+        self.advanced_settings: Final[AdvancedSettingsModel] = advanced_settings
+        self.scheduler: Final[Scheduler] = scheduler
+        self.__run: Optional[EngineRun] = None
+        self.__remote: Optional[RemoteEngine] = None
+        self.__dispatch_latency: Final[DispatchLatencyEstimator] = DispatchLatencyEstimator()
+        self.__timeline: Optional[Timeline] = None
+        self.__start_ns: int = 0
+        self.__last_phase_end: int = 0
+        self.__remote_run = False
+        self.__stopping = False
+        # the phases each adjustment sent to the engine would leave; shown once the engine applies it
+        self.__retargets: Final[collections.deque[Plan]] = collections.deque()
+        # keeps stop() from interleaving with the scheduler chaining the next queued plan
+        self.__chain_lock: Final[threading.Lock] = threading.Lock()
+        self.start_latency: int = 0
+        # (wall_ns, uncertainty_ns) of the boundary the pending run is aligned to
+        self.__alignment: Optional[tuple[int, int]] = None
+        # the recorder of the traced run in progress; a finished run's recorder goes to the writer
+        # thread and comes back as a spare, so recorders are only allocated while the writer is behind
+        self.__trace: Optional[TraceRecorder] = None
+        self.__spare_traces: Final[queue.SimpleQueue[TraceRecorder]] = queue.SimpleQueue()
+        self.__tracing = False
+        self.__trace_phase = 0
+        state.phases_changed.connect(self.__invalidate_timeline)
+        action_settings.settings_changed.connect(self.__invalidate_timeline)
+        advanced_settings.settings_changed.connect(self.__update_remote)
+
+    @override
+    def _on_start(self):
+        self.__update_remote()
 
-    def start(self):
+    @override
+    def _on_close(self):
+        self.stop()
+        if self.__remote is not None:
+            self.__remote.close()
+
+    def start(self, start_ns: Optional[int] = None):
+        """
+        Starts a run with t=0 at `start_ns`, which callers should capture as early as possible.
+        With aligned start enabled, t=0 is instead pinned to the next wall-clock second boundary.
+        """
+        if start_ns is None:
+            start_ns = self.scheduler.now()
         if not self.state.running:
-            clock = Clock()
-            self.state.running = True
+            plan = self.__create_plan()
+            simulated = self.scheduler.simulated
+            self.__alignment = None
+            if self.timer_settings.aligned_start.get() and not simulated:
+                start_ns = self.__align_start()
+            self.__start_ns = start_ns
+            self.__last_phase_end = 0
+            self.state.phase_started_at = start_ns
+            self.__remote_run = self.__remote is not None and self.advanced_settings.out_of_process.get()
+            self.__retargets.clear()
+            # the plan goes out before the running_changed listeners get the main thread; a run that
+            # finishes first waits on the lock, so it still sees itself running and resets the state
+            with self.__chain_lock:
+                if self.__remote_run:
+                    self.__remote.set_action_lead(self.__action_lead())
+                    self.__remote.start(start_ns, plan)
+                else:
+                    self.__submit(start_ns, plan)
+                self.state.running = True
+
+    def __update_remote(self):
+        """ Keeps the engine process up while out-of-process runs are enabled, so a start never waits on a spawn """
+        if self.scheduler.simulated:
+            return
+        enabled = self.advanced_settings.out_of_process.get()
+        if enabled and self.__remote is None:
+            self.__remote = RemoteEngine(self)
+        elif not enabled and self.__remote is not None and not (self.state.running and self.__remote_run):
+            # a run in progress keeps its process; it is shut down with the next change or on close
+            self.__remote.close()
+            self.__remote = None
 
-            func = functools.partial(self.__run, clock, self.state.phases)
-            self.__thread = DelegatingQThread(func, self)
-            self.__thread.start()
+    def __align_start(self) -> int:
+        """ Returns the instant of the next aligned second on the engine clock, leaving room to hand the run over """
+        offset = self.timer_settings.aligned_start_offset.get() * NANOSECONDS_PER_MILLISECOND
+        wall_ns, perf_ns, uncertainty = next_second_boundary(offset, self.ALIGNMENT_MARGIN)
+        self.__alignment = (wall_ns, uncertainty)
+        return perf_ns
 
     def stop(self):
         if self.state.running:
-            self.state.running = False
-
-            self.__thread.quit()
-            self.__thread.wait()
-            self.__thread.deleteLater()
-            self.__thread = None
+            stop_start = time.perf_counter_ns()
+            # the engine is interrupted before anything else, so no action fires while the
+            # running_changed listeners are busy on this thread
+            with self.__chain_lock:
+                self.__stopping = True
+                run = self.__run
+                if self.__remote_run:
+                    self.__remote.stop()
+                elif run is not None:
+                    run.stop()
+            if run is not None and not self.__remote_run:
+                run.finished.wait()
+            stop_latency = (time.perf_counter_ns() - stop_start) / 1000
+            logging.info(f'> INFO: PhaseRunner#stop_latency: {stop_latency:.1f}us')
 
+            with self.__chain_lock:
+                self.__stopping = False
+                self.state.running = False
+                self.state.clear_queue()
             self.state.reset()
 
-    def __run(self, clock: Clock, phases: list[float]):
-        while self.state.running and self.state.current_phase_index < len(phases):
-            current_phase = self.state.current_phase
-            # build actions to trigger
-            actions = []
-            for i in range(self.action_settings.count.get()):
-                event = self.action_settings.interval.get() * i
-                if event < current_phase:
-                    actions.append(event)
-            # execute the phase
-            self.__execute_phase(current_phase, clock, iter(reversed(actions)))
-            self.state.current_phase_index += 1
-        self.state.running = False
-        self.state.reset()
-
-    def __execute_phase(self,
-                        phase: float,
-                        clock: Clock,
-                        actions: Iterator[int]):
-        ticks = 0
-        elapsed = clock.tick()
-        next_action = next(actions, 0)
-        period = self.timer_settings.refresh_interval.get()
-        while self.state.running and elapsed < phase:
-            adjusted_period = period
-            remaining_until_action = phase - elapsed - next_action
-            if remaining_until_action < adjusted_period:
-                adjusted_period = remaining_until_action
-
-            time.sleep(adjusted_period / 1000)
-
-            delta = clock.tick()
-            remaining = phase - elapsed - delta
-            if remaining <= next_action:
-                self.state.trigger_action()
-                next_action = next(actions, None)
-
-            ticks += 1
-            elapsed += delta
-            if ticks % 4 == 0:
-                self.state.current_phase_elapsed = elapsed
+    def __chain_next(self) -> bool:
+        """ Starts the next queued plan exactly where the finished one ended """
+        with self.__chain_lock:
+            if not self.state.running or self.__stopping:
+                return False
+            start_ns = self.__start_ns + self.__last_phase_end
+            if self.state.advance_queue(start_ns) is None:
+                return False
+            self.__start_ns = start_ns
+            self.__last_phase_end = 0
+            self.__retargets.clear()
+            # phases_changed reaches __invalidate_timeline through a queued connection from this
+            # thread, so the cached timeline is dropped here rather than left to the signal
+            self.__timeline = None
+            plan = self.__create_plan()
+            logging.info(f'> INFO: PhaseRunner#chain: {len(plan.timeline.phases)} phases, '
+                         f'handoff {(self.scheduler.now() - start_ns) / 1000:.1f}us after the previous end')
+            if self.__remote_run:
+                self.__remote.start(start_ns, plan)
+            else:
+                self.__submit(start_ns, plan)
+            return True
+
+    def update_phases(self, phases: Plan):
+        """
+        Re-targets the run in progress. Phases before the current one are kept; the current and later
+        phases are replaced, and the current phase is measured from when it actually started.
+        When only the current phase changes, and keeps its number of actions, the run is shifted like
+        shift_deadline() does; otherwise the remaining phases are compiled into a new timeline, which
+        costs time in proportion to their number.
+        """
+        # one snapshot, so the phase index belongs to the run that was checked for
+        running, phase_index, _ = self.state.snapshot()
+        if not running:
+            self.state.phases = phases
+            return
+        targeted = self.__targeted_phases()
+        remaining = tuple(phases[phase_index:])
+        if (remaining and remaining[1:] == targeted[phase_index + 1:]
+                and self.__action_count(remaining[0]) == self.__action_count(targeted[phase_index])):
+            shift = remaining[0] - targeted[phase_index]
+            self.__adjust(Adjustment(phase_index, shift=shift), targeted[:phase_index] + remaining)
+            return
+        timeline = Timeline.compile(remaining,
+                                    self.action_settings.count.get(),
+                                    self.action_settings.interval.get())
+        self.__adjust(Adjustment(phase_index, timeline=timeline), targeted[:phase_index] + remaining)
+
+    def __action_count(self, phase: int) -> int:
+        """ The number of actions a timeline gives a phase of `phase` ns """
+        interval = self.action_settings.interval.get() * NANOSECONDS_PER_MILLISECOND
+        return sum(1 for i in range(self.action_settings.count.get()) if interval * i < phase)
+
+    def shift_deadline(self, delta: int):
+        """ Moves the end of the current phase, and everything after it, by `delta` ns """
+        running, phase_index, _ = self.state.snapshot()
+        if running:
+            phases = list(self.__targeted_phases())
+            phases[phase_index] += delta
+            self.__adjust(Adjustment(phase_index, shift=delta), tuple(phases))
+
+    def __targeted_phases(self) -> Plan:
+        """ The phases the run will have once every adjustment sent so far is applied """
+        retargets = self.__retargets
+        return retargets[-1] if retargets else self.state.phases
+
+    def __adjust(self, adjustment: Adjustment, phases: Plan):
+        logging.info(f'> INFO: PhaseRunner#adjust: {phases}')
+        self.__retargets.append(phases)
+        if self.__remote_run:
+            self.__remote.adjust(adjustment)
+        elif self.__run is not None:
+            self.__run.adjust(adjustment)
+
+    def record_dispatch_latency(self, latency: int):
+        """ Called on the main thread with the delay between an action firing and it executing """
+        estimate = self.__dispatch_latency.record(latency)
+        self.dispatch_latency_estimated.emit(estimate)
+        # feed the estimate back into the run in progress so the next triggers are issued early
+        lead = self.__action_lead()
+        if self.__remote_run:
+            self.__remote.set_action_lead(lead)
+        elif self.__run is not None:
+            self.__run.action_lead = lead
+
+    def __submit(self, start_ns: int, plan: RunPlan):
+        self.__tracing = self.advanced_settings.trace_runs.get() and not self.scheduler.simulated
+        if self.__tracing:
+            try:
+                self.__trace = self.__spare_traces.get_nowait()
+            except queue.Empty:
+                self.__trace = TraceRecorder()
+            self.__trace.reset()
+            self.__trace_phase = 0
+        run = EngineRun(Clock(start_ns, self.scheduler.engine.now), plan, self)
+        run.action_lead = self.__action_lead()
+        self.__run = self.scheduler.submit(run)
+
+    def __action_lead(self) -> int:
+        if not self.advanced_settings.latency_compensation.get():
+            return 0
+        return min(self.__dispatch_latency.estimate, self.MAX_ACTION_LEAD)
+
+    def __create_plan(self) -> RunPlan:
+        if self.__timeline is None:
+            self.__timeline = Timeline.compile(self.state.phases,
+                                               self.action_settings.count.get(),
+                                               self.action_settings.interval.get())
+        return create_run_plan(self.__timeline, self.timer_settings, self.advanced_settings)
+
+    def __invalidate_timeline(self):
+        self.__timeline = None
+
+    @override
+    def on_run_started(self, start_latency: int):
+        self.start_latency = start_latency
+        self.start_latency_measured.emit(start_latency)
+        logging.info(f'> INFO: PhaseRunner#start_latency: {start_latency / 1000:.1f}us')
+        if self.__alignment is not None:
+            wall_ns, uncertainty = self.__alignment
+            self.__alignment = None
+            seconds, fraction = divmod(wall_ns, NANOSECONDS_PER_SECOND)
+            logging.info(f'> INFO: PhaseRunner#aligned_start: t=0 at '
+                         f'{time.strftime("%H:%M:%S", time.localtime(seconds))}.{fraction // 1_000_000:03d}, '
+                         f'error={start_latency / 1000:.1f}us (wall clock mapping ±{uncertainty / 1000:.1f}us)')
+
+    @override
+    def on_realtime_applied(self, report: str):
+        logging.info(f'> INFO: PhaseRunner#realtime: {report}')
+        self.realtime_applied.emit(report)
+
+    @override
+    def on_wake(self, target: int, woke_at: int):
+        if self.__tracing:
+            self.__trace.record(TraceKind.WAKE, self.__trace_phase, woke_at, woke_at - target)
+
+    @override
+    def on_action(self, fired_at: int):
+        if self.__tracing:
+            # the trigger error is only known to the engine; it is filled in from the run's stats
+            self.__trace.record(TraceKind.ACTION, self.__trace_phase, fired_at, 0)
+        self.state.trigger_action(fired_at)
+
+    @override
+    def on_phase_end(self, phase_start: int, ended_at: int):
+        if self.__tracing:
+            deadline = self.__start_ns + phase_start
+            self.__trace.record(TraceKind.PHASE_END, self.__trace_phase, deadline, ended_at - deadline)
+            self.__trace_phase += 1
+        self.__last_phase_end = phase_start
+        self.state.begin_phase(self.state.current_phase_index + 1, self.__start_ns + phase_start)
+
+    @override
+    def on_adjusted(self, applied: bool):
+        phases = self.__retargets.popleft()
+        if applied:
+            self.state.retarget(phases)
+        else:
+            logging.warning(f'> WARN: PhaseRunner#adjust: not applied, keeping {self.state.phases}')
+
+    @override
+    def on_deadline_missed(self, kind: EventKind, lateness: int):
+        logging.warning(f'> WARN: PhaseRunner#deadline_missed: {kind.name} late by {lateness / 1000:.1f}us')
+        self.state.deadline_missed.emit(lateness)
+
+    @override
+    def on_run_finished(self, stats: RunStats):
+        stats.log()
+        trace = None
+        start_ns = self.__start_ns
+        if self.__tracing:
+            self.__tracing = False
+            trace, self.__trace = self.__trace, None
+        if self.__dispatch_latency.samples:
+            logging.info(f'> INFO: PhaseRunner#dispatch_latency: {self.__dispatch_latency.estimate / 1000:.1f}us')
+        # the next queued plan is started before the trace is saved, so saving never delays it
+        chained = stats.completed and self.__chain_next()
+        if trace is not None:
+            self.__save_trace(trace, stats.trigger_errors, start_ns)
+        if chained:
+            return
+        # a run that ends while still marked running either completed or was aborted by the engine
+        with self.__chain_lock:
+            # a stopped run leaves the state to stop(), which flips it once the run has let go
+            if self.state.running and not self.__stopping:
+                self.state.running = False
+                self.state.reset()
+
+    def __save_trace(self, recorder: TraceRecorder, trigger_errors: Sequence[int], start_ns: int):
+        directory = trace_dir(QCoreApplication.applicationName(), QCoreApplication.organizationName())
+        path = os.path.join(directory, f'{time.strftime("%Y%m%d-%H%M%S")}-{start_ns}{TRACE_EXTENSION}')
+
+        def write():
+            recorder.fill(TraceKind.ACTION, trigger_errors)
+            trace = recorder.snapshot(start_ns)
+            self.__spare_traces.put(recorder)
+            os.makedirs(directory, exist_ok=True)
+            trace.write(path)
+            logging.info(f'> INFO: PhaseRunner#trace: {len(trace)} records written to {path}')
+
+        # fills, copies and writes off the engine thread, which may already be driving the next queued plan
+        threading.Thread(target=write, name='EonTimerTraceWriter').start()
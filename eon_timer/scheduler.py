@@ -0,0 +1,43 @@
+from typing import Final, Optional, override
+
+from PySide6.QtCore import QObject
+
+from eon_timer.engine.engine import EngineRun, PhaseEngine
+from eon_timer.util.injector import component
+from eon_timer.util.injector.lifecycle import StartListener, CloseListener
+from eon_timer.util.pyside.thread import DelegatingQThread
+
+
+@component()
+class Scheduler(QObject, StartListener, CloseListener):
+    """ The one thread that drives every in-process timer instance """
+
+    # simulated schedulers run on virtual time, where the wall clock and other processes mean nothing
+    simulated: bool = False
+
+    def __init__(self):
+        super().__init__()
+        self.engine: Final[PhaseEngine] = self._create_engine()
+        self.__thread: Optional[DelegatingQThread] = None
+
+    def _create_engine(self) -> PhaseEngine:
+        return PhaseEngine()
+
+    @override
+    def _on_start(self):
+        # the thread stays parked between runs so that starting a timer only hands it a plan
+        self.__thread = DelegatingQThread(self.engine.serve, self)
+        self.__thread.start()
+
+    @override
+    def _on_close(self):
+        self.engine.close()
+        if self.__thread is not None:
+            self.__thread.wait()
+
+    def now(self) -> int:
+        """ Current time on the engine's clock, in nanoseconds """
+        return self.engine.now()
+
+    def submit(self, run: EngineRun) -> EngineRun:
+        return self.engine.submit(run)
@@ -0,0 +1,49 @@
+from enum import StrEnum
+from typing import override
+
+from eon_timer.util import clock
+from eon_timer.util.enum import EnhancedEnum
+from eon_timer.util.injector import component
+from eon_timer.util.properties.property import Property
+from eon_timer.util.properties.settings import Settings
+
+
+class RealtimePolicy(EnhancedEnum, StrEnum):
+    FIFO = 'SCHED_FIFO'
+    RR = 'SCHED_RR'
+
+
+class ClockSource(EnhancedEnum, StrEnum):
+    AUTO = 'Auto'
+    PERF_COUNTER = clock.PERF_COUNTER
+    MONOTONIC = clock.MONOTONIC
+    MONOTONIC_RAW = clock.MONOTONIC_RAW
+    BOOTTIME = clock.BOOTTIME
+
+
+@component()
+class AdvancedSettingsModel(Settings):
+    realtime = Property(False)
+    realtime_policy = Property(RealtimePolicy.FIFO, value_type=str)
+    realtime_priority = Property(10)
+    cpu_affinity = Property('', value_type=str)
+    lock_memory = Property(False)
+    gc_control = Property(True)
+    out_of_process = Property(False)
+    latency_compensation = Property(False)
+    clock_source = Property(ClockSource.AUTO, value_type=str)
+    trace_runs = Property(False)
+
+    @property
+    @override
+    def group(self) -> str:
+        return 'advanced'
+
+    @property
+    def cpus(self) -> set[int]:
+        cpus = set()
+        for cpu in self.cpu_affinity.get().split(','):
+            cpu = cpu.strip()
+            if cpu.isdigit():
+                cpus.add(int(cpu))
+        return cpus
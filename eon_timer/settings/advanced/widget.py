@@ -2,29 +2,183 @@ from typing import Final
 
 from PySide6.QtCore import Signal
 from PySide6.QtGui import Qt
-from PySide6.QtWidgets import QWidget, QPushButton, QVBoxLayout, QMessageBox
+from PySide6.QtWidgets import QCheckBox, QLabel, QLineEdit, QMessageBox, QPushButton, QSpinBox
 
+from eon_timer.clock_sources import ClockSources
+from eon_timer.phase_runner import PhaseRunner
 from eon_timer.util.injector import component
+from eon_timer.util.properties import bindings
+from eon_timer.util.properties.property import Property
+from eon_timer.util.properties.property_change import PropertyChangeEvent
+from eon_timer.util.pyside import EnumComboBox
+from eon_timer.util.pyside.form import FormWidget
+from .model import AdvancedSettingsModel, ClockSource, RealtimePolicy
 
 
 @component()
-class AdvancedSettingsWidget(QWidget):
+class AdvancedSettingsWidget(FormWidget):
     on_reset: Final[Signal] = Signal()
 
-    def __init__(self):
+    class Field(FormWidget.Field):
+        REALTIME = 'Realtime Mode'
+        REALTIME_POLICY = 'Scheduling Policy'
+        REALTIME_PRIORITY = 'Priority'
+        CPU_AFFINITY = 'CPU Affinity'
+        LOCK_MEMORY = 'Lock Memory'
+        REALTIME_STATUS = 'Realtime Status'
+        START_LATENCY = 'Start Latency'
+        GC_CONTROL = 'Pause GC During Runs'
+        OUT_OF_PROCESS = 'Out-of-Process Engine'
+        LATENCY_COMPENSATION = 'Compensate Dispatch Latency'
+        DISPATCH_LATENCY = 'Dispatch Latency'
+        CLOCK_SOURCE = 'Clock Source'
+        CLOCK_SOURCES = 'Measured Sources'
+        TRACE_RUNS = 'Record Run Traces'
+        RESET = 'Reset Settings'
+
+    def __init__(self,
+                 model: AdvancedSettingsModel,
+                 phase_runner: PhaseRunner,
+                 clock_sources: ClockSources):
         super().__init__()
+        self.realtime: Final = Property(model.realtime.get())
+        self.realtime_policy: Final = Property(model.realtime_policy.get())
+        self.realtime_priority: Final = Property(model.realtime_priority.get())
+        self.cpu_affinity: Final = Property(model.cpu_affinity.get())
+        self.lock_memory: Final = Property(model.lock_memory.get())
+        self.gc_control: Final = Property(model.gc_control.get())
+        self.out_of_process: Final = Property(model.out_of_process.get())
+        self.latency_compensation: Final = Property(model.latency_compensation.get())
+        self.clock_source: Final = Property(model.clock_source.get())
+        self.trace_runs: Final = Property(model.trace_runs.get())
+        self.model: Final[AdvancedSettingsModel] = model
+        self.phase_runner: Final[PhaseRunner] = phase_runner
+        self.clock_sources: Final[ClockSources] = clock_sources
+        self.realtime_status_lbl: Final[QLabel] = QLabel('inactive')
+        self.start_latency_lbl: Final[QLabel] = QLabel('-')
+        self.dispatch_latency_lbl: Final[QLabel] = QLabel('-')
+        self.clock_sources_lbl: Final[QLabel] = QLabel()
         self.__init_components()
 
     def __init_components(self):
         self.setObjectName('advancedSettingsWidget')
         # ----- layout -----
-        layout = QVBoxLayout(self)
-        layout.setSpacing(10)
+        self._layout.set_alignment(Qt.AlignmentFlag.AlignTop)
+        self._layout.set_content_margins(10, 10, 10, 10)
+        # ----- realtime -----
+        field = QCheckBox()
+        field.setTristate(False)
+        bindings.bind_checkbox(field, self.realtime)
+        self.add_field(self.Field.REALTIME, field,
+                       name='advancedSettingsRealtime')
+        self.realtime.on_change(self.__on_realtime_changed)
+        realtime = self.realtime.get()
+        # ----- realtime_policy -----
+        field = EnumComboBox(RealtimePolicy)
+        bindings.bind_enum_combobox(field, self.realtime_policy)
+        self.add_field(self.Field.REALTIME_POLICY, field,
+                       visible=realtime,
+                       name='advancedSettingsRealtimePolicy')
+        # ----- realtime_priority -----
+        field = QSpinBox()
+        field.setRange(1, 99)
+        bindings.bind_spinbox(field, self.realtime_priority)
+        self.add_field(self.Field.REALTIME_PRIORITY, field,
+                       visible=realtime,
+                       name='advancedSettingsRealtimePriority')
+        # ----- cpu_affinity -----
+        field = QLineEdit()
+        field.setPlaceholderText('e.g. 2,3')
+        bindings.bind_line_edit(field, self.cpu_affinity)
+        self.add_field(self.Field.CPU_AFFINITY, field,
+                       visible=realtime,
+                       name='advancedSettingsCpuAffinity')
+        # ----- lock_memory -----
+        field = QCheckBox()
+        field.setTristate(False)
+        bindings.bind_checkbox(field, self.lock_memory)
+        self.add_field(self.Field.LOCK_MEMORY, field,
+                       visible=realtime,
+                       name='advancedSettingsLockMemory')
+        # ----- realtime_status -----
+        self.add_field(self.Field.REALTIME_STATUS, self.realtime_status_lbl,
+                       visible=realtime,
+                       name='advancedSettingsRealtimeStatus')
+        self.phase_runner.realtime_applied.connect(self.realtime_status_lbl.setText)
+        # ----- gc_control -----
+        field = QCheckBox()
+        field.setTristate(False)
+        bindings.bind_checkbox(field, self.gc_control)
+        self.add_field(self.Field.GC_CONTROL, field,
+                       name='advancedSettingsGcControl')
+        # ----- out_of_process -----
+        field = QCheckBox()
+        field.setTristate(False)
+        bindings.bind_checkbox(field, self.out_of_process)
+        self.add_field(self.Field.OUT_OF_PROCESS, field,
+                       name='advancedSettingsOutOfProcess')
+        # ----- start_latency -----
+        self.add_field(self.Field.START_LATENCY, self.start_latency_lbl,
+                       name='advancedSettingsStartLatency')
+        self.phase_runner.start_latency_measured.connect(self.__on_start_latency_measured)
+        # ----- latency_compensation -----
+        field = QCheckBox()
+        field.setTristate(False)
+        bindings.bind_checkbox(field, self.latency_compensation)
+        self.add_field(self.Field.LATENCY_COMPENSATION, field,
+                       name='advancedSettingsLatencyCompensation')
+        # ----- dispatch_latency -----
+        self.add_field(self.Field.DISPATCH_LATENCY, self.dispatch_latency_lbl,
+                       name='advancedSettingsDispatchLatency')
+        self.phase_runner.dispatch_latency_estimated.connect(self.__on_dispatch_latency_estimated)
+        # ----- clock_source -----
+        field = EnumComboBox(ClockSource)
+        bindings.bind_enum_combobox(field, self.clock_source)
+        self.add_field(self.Field.CLOCK_SOURCE, field,
+                       name='advancedSettingsClockSource')
+        # ----- clock_sources -----
+        self.add_field(self.Field.CLOCK_SOURCES, self.clock_sources_lbl,
+                       name='advancedSettingsClockSources')
+        self.clock_sources.selected.connect(self.__update_clock_sources)
+        self.clock_sources.drift_measured.connect(self.__update_clock_sources)
+        self.__update_clock_sources()
+        # ----- trace_runs -----
+        field = QCheckBox()
+        field.setTristate(False)
+        bindings.bind_checkbox(field, self.trace_runs)
+        self.add_field(self.Field.TRACE_RUNS, field,
+                       name='advancedSettingsTraceRuns')
         # ----- reset_button -----
-        button = QPushButton('Reset Settings')
+        button = QPushButton(self.Field.RESET.value)
         button.setObjectName('advancedSettingsResetButton')
         button.clicked.connect(self.__on_reset)
-        layout.addWidget(button, alignment=Qt.AlignmentFlag.AlignTop)
+        self.add_field(self.Field.RESET, button, with_label=False)
+
+    def __on_realtime_changed(self, event: PropertyChangeEvent[bool]):
+        for field in (self.Field.REALTIME_POLICY,
+                      self.Field.REALTIME_PRIORITY,
+                      self.Field.CPU_AFFINITY,
+                      self.Field.LOCK_MEMORY,
+                      self.Field.REALTIME_STATUS):
+            self.set_visible(field, bool(event.new_value))
+
+    def __on_start_latency_measured(self, start_latency: int):
+        self.start_latency_lbl.setText(f'{start_latency // 1000}µs')
+
+    def __on_dispatch_latency_estimated(self, estimate: int):
+        self.dispatch_latency_lbl.setText(f'{estimate // 1000}µs')
+
+    def __update_clock_sources(self):
+        lines = []
+        for name, report in self.clock_sources.reports.items():
+            line = f'{name}: {report.overhead}ns/read, {report.resolution}ns'
+            drift = self.clock_sources.drift.get(name)
+            if drift is not None:
+                line += f', {drift:+.2f}ppm'
+            if name == self.clock_sources.best:
+                line += ' (auto)'
+            lines.append(line)
+        self.clock_sources_lbl.setText('\n'.join(lines))
 
     def __on_reset(self):
         reply = QMessageBox.warning(self,
@@ -34,3 +188,35 @@ class AdvancedSettingsWidget(QWidget):
                                     QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             self.on_reset.emit()
+
+    def on_accepted(self):
+        self.model.realtime.update(self.realtime)
+        self.model.realtime_policy.update(self.realtime_policy)
+        self.model.realtime_priority.update(self.realtime_priority)
+        self.model.cpu_affinity.update(self.cpu_affinity)
+        self.model.lock_memory.update(self.lock_memory)
+        self.model.gc_control.update(self.gc_control)
+        self.model.out_of_process.update(self.out_of_process)
+        self.model.latency_compensation.update(self.latency_compensation)
+        self.model.clock_source.update(self.clock_source)
+        self.model.trace_runs.update(self.trace_runs)
+        self.model.settings_changed.emit()
+
+    def on_rejected(self):
+        self.__reset_properties()
+
+    def reset(self):
+        self.model.reset()
+        self.__reset_properties()
+
+    def __reset_properties(self):
+        self.realtime.update(self.model.realtime)
+        self.realtime_policy.update(self.model.realtime_policy)
+        self.realtime_priority.update(self.model.realtime_priority)
+        self.cpu_affinity.update(self.model.cpu_affinity)
+        self.lock_memory.update(self.model.lock_memory)
+        self.gc_control.update(self.model.gc_control)
+        self.out_of_process.update(self.model.out_of_process)
+        self.latency_compensation.update(self.model.latency_compensation)
+        self.clock_source.update(self.model.clock_source)
+        self.trace_runs.update(self.model.trace_runs)
@@ -63,12 +63,14 @@ class SettingsDialog(QDialog):
         self.action_settings_widget.on_accepted()
         self.timer_settings_widget.on_accepted()
         self.theme_settings_widget.on_accepted()
+        self.advanced_settings_widget.on_accepted()
         self.done(QDialog.DialogCode.Accepted)
 
     def __on_cancelled(self) -> None:
         self.action_settings_widget.on_rejected()
         self.timer_settings_widget.on_rejected()
         self.theme_settings_widget.on_rejected()
+        self.advanced_settings_widget.on_rejected()
         self.done(QDialog.DialogCode.Rejected)
 
     def __on_reset(self):
@@ -76,4 +78,5 @@ class SettingsDialog(QDialog):
         self.action_settings_widget.on_reset()
         self.timer_settings_widget.on_reset()
         self.theme_settings_widget.on_reset()
+        self.advanced_settings_widget.reset()
         self.done(QDialog.DialogCode.Accepted)
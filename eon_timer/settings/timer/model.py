@@ -14,6 +14,9 @@ GBA_FRAMERATE: Final[float] = 1000 / GBA_FPS
 NDS_SLOT1_FRAMERATE: Final[float] = 1000 / NDS_SLOT1_FPS
 NDS_SLOT2_FRAMERATE: Final[float] = 1000 / NDS_SLOT2_FPS
 
+# milliseconds; spinning any longer burns a core for no gain over a precise sleep
+MAX_SPIN_WINDOW: Final[int] = 5
+
 
 class Console(EnhancedEnum, StrEnum):
     GBA = 'GBA'
@@ -48,12 +51,49 @@ class Console(EnhancedEnum, StrEnum):
                 return None
 
 
+class FinalWaitMode(EnhancedEnum, StrEnum):
+    SLEEP = 'Sleep'
+    HYBRID = 'Sleep + Spin'
+
+
+class WaitPolicy(EnhancedEnum, StrEnum):
+    FIXED = 'Fixed Interval'
+    ADAPTIVE = 'Adaptive'
+
+
+class MissPolicy(EnhancedEnum, StrEnum):
+    FIRE = 'Fire Immediately'
+    SKIP = 'Skip Stale Actions'
+    ABORT = 'Abort Run'
+
+
+class RenderMode(EnhancedEnum, StrEnum):
+    REFRESH_INTERVAL = 'Refresh Interval'
+    DISPLAY_RATE = 'Display Refresh Rate'
+
+
+class TimerBackend(EnhancedEnum, StrEnum):
+    SLEEP = 'Sleep'
+    CLOCK_NANOSLEEP = 'clock_nanosleep'
+    TIMERFD = 'timerfd'
+    QT_PRECISE_TIMER = 'Qt Precise Timer'
+
+
 @component()
 class TimerSettingsModel(Settings):
     console = Property(Console.NDS_SLOT1, value_type=str)
     custom_framerate = FloatProperty(60.0)
     precision_calibration = Property(False)
     refresh_interval = Property(8)
+    render_mode = Property(RenderMode.DISPLAY_RATE, value_type=str)
+    final_wait = Property(FinalWaitMode.SLEEP, value_type=str)
+    timer_backend = Property(TimerBackend.SLEEP, value_type=str)
+    spin_window = Property(2)
+    wait_policy = Property(WaitPolicy.ADAPTIVE, value_type=str)
+    miss_threshold = Property(5)
+    miss_policy = Property(MissPolicy.FIRE, value_type=str)
+    aligned_start = Property(False)
+    aligned_start_offset = Property(0)
 
     @property
     @override
@@ -10,7 +10,8 @@ from eon_timer.util.properties.property import Property, FloatProperty
 from eon_timer.util.properties.property_change import PropertyChangeEvent
 from eon_timer.util.pyside import EnumComboBox
 from eon_timer.util.pyside.form import FormWidget
-from .model import TimerSettingsModel, Console
+from .model import TimerSettingsModel, Console, RenderMode, FinalWaitMode, TimerBackend, WaitPolicy, MissPolicy, \
+    MAX_SPIN_WINDOW
 
 
 @component()
@@ -19,6 +20,15 @@ class TimerSettingsWidget(FormWidget):
         CONSOLE = 'Console'
         CUSTOM_FRAMERATE = 'Custom Framerate'
         REFRESH_INTERVAL = 'Refresh Interval'
+        RENDER_MODE = 'Render Mode'
+        FINAL_WAIT = 'Final Wait'
+        SPIN_WINDOW = 'Spin Window'
+        TIMER_BACKEND = 'Timer Backend'
+        WAIT_POLICY = 'Wait Policy'
+        MISS_THRESHOLD = 'Miss Threshold'
+        MISS_POLICY = 'Miss Policy'
+        ALIGNED_START = 'Align Start to Second'
+        ALIGNED_START_OFFSET = 'Alignment Offset'
         PRECISION_CALIBRATION = 'Precision Calibration'
 
     def __init__(self, model: TimerSettingsModel) -> None:
@@ -27,6 +37,15 @@ class TimerSettingsWidget(FormWidget):
         self.custom_framerate: Final = FloatProperty(model.custom_framerate.get())
         self.precision_calibration: Final = Property(model.precision_calibration.get())
         self.refresh_interval: Final = Property(model.refresh_interval.get())
+        self.render_mode: Final = Property(model.render_mode.get())
+        self.final_wait: Final = Property(model.final_wait.get())
+        self.spin_window: Final = Property(model.spin_window.get())
+        self.timer_backend: Final = Property(model.timer_backend.get())
+        self.wait_policy: Final = Property(model.wait_policy.get())
+        self.miss_threshold: Final = Property(model.miss_threshold.get())
+        self.miss_policy: Final = Property(model.miss_policy.get())
+        self.aligned_start: Final = Property(model.aligned_start.get())
+        self.aligned_start_offset: Final = Property(model.aligned_start_offset.get())
         self.model: Final[TimerSettingsModel] = model
         self.__init_components()
 
@@ -54,6 +73,59 @@ class TimerSettingsWidget(FormWidget):
         bindings.bind_spinbox(field, self.refresh_interval)
         self.add_field(self.Field.REFRESH_INTERVAL, field,
                        name='timerSettingsRefreshInterval')
+        # ----- render mode -----
+        field = EnumComboBox(RenderMode)
+        bindings.bind_enum_combobox(field, self.render_mode)
+        self.add_field(self.Field.RENDER_MODE, field,
+                       name='timerSettingsRenderMode')
+        # ----- final wait -----
+        field = EnumComboBox(FinalWaitMode)
+        bindings.bind_enum_combobox(field, self.final_wait)
+        self.add_field(self.Field.FINAL_WAIT, field,
+                       name='timerSettingsFinalWait')
+        # ----- spin window -----
+        field = QSpinBox()
+        field.setRange(0, MAX_SPIN_WINDOW)
+        bindings.bind_spinbox(field, self.spin_window)
+        self.add_field(self.Field.SPIN_WINDOW, field,
+                       visible=self.final_wait.get() == FinalWaitMode.HYBRID,
+                       name='timerSettingsSpinWindow')
+        self.final_wait.on_change(self.__on_final_wait_changed)
+        # ----- timer backend -----
+        field = EnumComboBox(TimerBackend)
+        bindings.bind_enum_combobox(field, self.timer_backend)
+        self.add_field(self.Field.TIMER_BACKEND, field,
+                       name='timerSettingsTimerBackend')
+        # ----- wait policy -----
+        field = EnumComboBox(WaitPolicy)
+        bindings.bind_enum_combobox(field, self.wait_policy)
+        self.add_field(self.Field.WAIT_POLICY, field,
+                       name='timerSettingsWaitPolicy')
+        # ----- miss threshold -----
+        field = QSpinBox()
+        field.setRange(1, 1000)
+        bindings.bind_spinbox(field, self.miss_threshold)
+        self.add_field(self.Field.MISS_THRESHOLD, field,
+                       name='timerSettingsMissThreshold')
+        # ----- miss policy -----
+        field = EnumComboBox(MissPolicy)
+        bindings.bind_enum_combobox(field, self.miss_policy)
+        self.add_field(self.Field.MISS_POLICY, field,
+                       name='timerSettingsMissPolicy')
+        # ----- aligned start -----
+        field = QCheckBox()
+        field.setTristate(False)
+        bindings.bind_checkbox(field, self.aligned_start)
+        self.add_field(self.Field.ALIGNED_START, field,
+                       name='timerSettingsAlignedStart')
+        # ----- aligned start offset -----
+        field = QSpinBox()
+        field.setRange(0, 999)
+        bindings.bind_spinbox(field, self.aligned_start_offset)
+        self.add_field(self.Field.ALIGNED_START_OFFSET, field,
+                       visible=self.aligned_start.get(),
+                       name='timerSettingsAlignedStartOffset')
+        self.aligned_start.on_change(self.__on_aligned_start_changed)
         # ----- precision calibration -----
         field = QCheckBox()
         field.setTristate(False)
@@ -64,10 +136,25 @@ class TimerSettingsWidget(FormWidget):
     def __on_console_changed(self, event: PropertyChangeEvent[Console]):
         self.set_visible(self.Field.CUSTOM_FRAMERATE, event.new_value == Console.CUSTOM)
 
+    def __on_final_wait_changed(self, event: PropertyChangeEvent[FinalWaitMode]):
+        self.set_visible(self.Field.SPIN_WINDOW, event.new_value == FinalWaitMode.HYBRID)
+
+    def __on_aligned_start_changed(self, event: PropertyChangeEvent[bool]):
+        self.set_visible(self.Field.ALIGNED_START_OFFSET, event.new_value)
+
     def on_accepted(self):
         self.model.console.update(self.console)
         self.model.custom_framerate.update(self.custom_framerate)
         self.model.refresh_interval.update(self.refresh_interval)
+        self.model.render_mode.update(self.render_mode)
+        self.model.final_wait.update(self.final_wait)
+        self.model.spin_window.update(self.spin_window)
+        self.model.timer_backend.update(self.timer_backend)
+        self.model.wait_policy.update(self.wait_policy)
+        self.model.miss_threshold.update(self.miss_threshold)
+        self.model.miss_policy.update(self.miss_policy)
+        self.model.aligned_start.update(self.aligned_start)
+        self.model.aligned_start_offset.update(self.aligned_start_offset)
         self.model.precision_calibration.update(self.precision_calibration)
 
     def on_rejected(self):
@@ -81,4 +168,13 @@ class TimerSettingsWidget(FormWidget):
         self.console.update(self.model.console)
         self.custom_framerate.update(self.model.custom_framerate)
         self.refresh_interval.update(self.model.refresh_interval)
+        self.render_mode.update(self.model.render_mode)
+        self.final_wait.update(self.model.final_wait)
+        self.spin_window.update(self.model.spin_window)
+        self.timer_backend.update(self.model.timer_backend)
+        self.wait_policy.update(self.model.wait_policy)
+        self.miss_threshold.update(self.model.miss_threshold)
+        self.miss_policy.update(self.model.miss_policy)
+        self.aligned_start.update(self.model.aligned_start)
+        self.aligned_start_offset.update(self.model.aligned_start_offset)
         self.precision_calibration.update(self.model.precision_calibration)
@@ -0,0 +1,76 @@
+import dataclasses
+from typing import Final, override
+
+from eon_timer.app_state import AppState
+from eon_timer.engine.engine import EngineRun, PhaseEngine
+from eon_timer.engine.virtual import VirtualBackend, VirtualClock
+from eon_timer.phase_runner import PhaseRunner
+from eon_timer.scheduler import Scheduler
+from eon_timer.settings.action.model import ActionSettingsModel
+from eon_timer.settings.advanced.model import AdvancedSettingsModel
+from eon_timer.settings.timer.model import TimerSettingsModel
+from eon_timer.timers.plan import Plan
+
+
+class SimulatedScheduler(Scheduler):
+    """ Runs plans on the calling thread against a virtual clock, as fast as the listeners allow """
+
+    simulated = True
+
+    def __init__(self, start_ns: int = 0):
+        self.clock: Final[VirtualClock] = VirtualClock(start_ns)
+        super().__init__()
+
+    @override
+    def _create_engine(self) -> PhaseEngine:
+        return PhaseEngine(self.clock.now, VirtualBackend(self.clock))
+
+    @override
+    def _on_start(self):
+        # no thread: run_until_idle() drives the engine
+        pass
+
+    @override
+    def submit(self, run: EngineRun) -> EngineRun:
+        # busy-waiting never ends on a clock that only moves on waits, and the process-level
+        # realtime and gc controls have nothing to protect in simulated time
+        plan = dataclasses.replace(run.plan, spin_window=0, realtime=None, gc_control=None)
+        simulated = EngineRun(run.clock, plan, run.listener)
+        simulated.action_lead = run.action_lead
+        return super().submit(simulated)
+
+    def run_until_idle(self):
+        self.engine.serve(until_idle=True)
+
+
+class Simulation:
+    """
+    A timer instance on a SimulatedScheduler. Its AppState emits the same signals as a real run,
+    carrying virtual timestamps, and a plan of any length completes instantly.
+    """
+
+    def __init__(self,
+                 timer_settings: TimerSettingsModel,
+                 action_settings: ActionSettingsModel,
+                 advanced_settings: AdvancedSettingsModel,
+                 start_ns: int = 0):
+        self.scheduler: Final[SimulatedScheduler] = SimulatedScheduler(start_ns)
+        self.state: Final[AppState] = AppState()
+        self.state.now = self.scheduler.now
+        self.runner: Final[PhaseRunner] = PhaseRunner(self.state,
+                                                      timer_settings,
+                                                      action_settings,
+                                                      advanced_settings,
+                                                      self.scheduler)
+
+    @property
+    def now(self) -> int:
+        return self.scheduler.now()
+
+    def run(self, phases: Plan, *queued: Plan):
+        """ Runs `phases`, then every queued plan back to back, and returns once they have all finished """
+        self.state.phases = phases
+        for plan in queued:
+            self.state.enqueue(plan)
+        self.runner.start(self.now)
+        self.scheduler.run_until_idle()
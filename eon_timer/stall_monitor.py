@@ -0,0 +1,99 @@
+import logging
+import statistics
+import sys
+import threading
+import time
+import traceback
+from typing import Final, Optional, override
+
+from PySide6.QtCore import QObject, Signal
+
+from eon_timer.app_state import AppState
+from eon_timer.timers.plan import NANOSECONDS_PER_MILLISECOND
+from eon_timer.util.injector import component
+from eon_timer.util.injector.lifecycle import CloseListener
+
+
+@component()
+class StallMonitor(QObject, CloseListener):
+    """
+    Measures how long the Qt main thread takes to service a heartbeat while a timer is running.
+    Actions and display updates run on the main thread, so whatever blocks it delays the beep.
+    """
+
+    heartbeat: Final[Signal] = Signal(object)
+
+    # pause between a serviced heartbeat and the next one
+    INTERVAL: Final[int] = 50 * NANOSECONDS_PER_MILLISECOND
+    # a heartbeat left waiting this long is a stall
+    STALL_THRESHOLD: Final[int] = 50 * NANOSECONDS_PER_MILLISECOND
+
+    def __init__(self, state: AppState):
+        super().__init__()
+        self.state: Final[AppState] = state
+        self.__stopped: Optional[threading.Event] = None
+        self.__serviced: Final[threading.Event] = threading.Event()
+        self.__latencies: Final[list[int]] = []
+        self.__stalls = 0
+        # queued: the heartbeat is emitted on the watchdog thread and serviced on the main thread
+        self.heartbeat.connect(self.__on_heartbeat)
+        state.running_changed.connect(self.__on_running_changed)
+
+    def __on_running_changed(self, running: bool):
+        if running:
+            self.__start()
+        else:
+            self.__stop()
+
+    def __start(self):
+        if self.__stopped is not None:
+            return
+        self.__latencies.clear()
+        self.__stalls = 0
+        # each watchdog gets its own stop event, so one still stuck waiting never outlives its run
+        self.__stopped = threading.Event()
+        threading.Thread(target=self.__watch,
+                         args=(self.__stopped,),
+                         name='EonTimerStallMonitor',
+                         daemon=True).start()
+
+    def __stop(self):
+        if self.__stopped is None:
+            return
+        self.__stopped.set()
+        self.__stopped = None
+        if self.__latencies:
+            mean = statistics.fmean(self.__latencies) / 1_000_000
+            worst = max(self.__latencies) / 1_000_000
+            logging.info(f'> INFO: StallMonitor#latency: mean={mean:.2f}ms, max={worst:.2f}ms '
+                         f'({len(self.__latencies)} heartbeats, {self.__stalls} stalls)')
+
+    def __on_heartbeat(self, posted_at: int):
+        self.__latencies.append(time.perf_counter_ns() - posted_at)
+        self.__serviced.set()
+
+    # ----- watchdog thread -----
+    def __watch(self, stopped: threading.Event):
+        main_thread = threading.main_thread().ident
+        while not stopped.wait(self.INTERVAL / 1_000_000_000):
+            self.__serviced.clear()
+            posted_at = time.perf_counter_ns()
+            self.heartbeat.emit(posted_at)
+            if self.__serviced.wait(self.STALL_THRESHOLD / 1_000_000_000):
+                continue
+            # still blocked, so the main thread's current stack is what is holding it up
+            self.__stalls += 1
+            frame = sys._current_frames().get(main_thread)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '(no Python frame)\n'
+            logging.warning(f'> WARN: StallMonitor#stall: main thread blocked for over '
+                            f'{self.STALL_THRESHOLD // NANOSECONDS_PER_MILLISECOND}ms during a run, at:\n'
+                            f'{stack.rstrip()}')
+            while not self.__serviced.wait(0.1):
+                if stopped.is_set():
+                    return
+            logging.warning(f'> WARN: StallMonitor#stall: main thread resumed after '
+                            f'{self.__latencies[-1] / 1_000_000:.1f}ms')
+
+    @override
+    def _on_close(self):
+        self.__stop()
@@ -1,22 +1,39 @@
 import importlib.resources
+import logging
+import time
 from typing import Final
 
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QGroupBox, QLabel, QVBoxLayout, QHBoxLayout, QWidget
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QGroupBox, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QWidget
 
 from eon_timer.app_state import AppState
+from eon_timer.settings.timer.model import TimerSettingsModel, RenderMode
 from eon_timer.util import pyside
 from eon_timer.util.injector import component
 
 
 @component()
 class TimerWidget(QGroupBox):
-    def __init__(self, state: AppState):
+    # used when the screen does not report its refresh rate
+    DEFAULT_REFRESH_RATE: Final[float] = 60.0
+
+    def __init__(self, state: AppState, timer_settings: TimerSettingsModel):
         super().__init__()
         self.state: Final[AppState] = state
+        self.timer_settings: Final[TimerSettingsModel] = timer_settings
+        self.refresh_timer: Final[QTimer] = QTimer(self)
         self.current_phase_lbl: Final[QLabel] = QLabel('0:000')
         self.minutes_before_target_lbl: Final[QLabel] = QLabel('0')
         self.next_phase_lbl: Final[QLabel] = QLabel('0:000')
+        self.deadline_missed_lbl: Final[QLabel] = QLabel()
+        self.queue_group: Final[QWidget] = QWidget()
+        self.queue_lbl: Final[QLabel] = QLabel()
+        self.queue_clear_btn: Final[QPushButton] = QPushButton('Clear')
+        self.__current_phase_text = '0:000'
+        self.__coalesce = False
+        self.__frames = 0
+        self.__redundant_updates = 0
+        self.__render_start = 0
         self.__init_components()
         self.__init_listeners()
 
@@ -60,30 +77,112 @@ class TimerWidget(QGroupBox):
         # ----- value_label -----
         self.next_phase_lbl.setObjectName('nextPhaseValueLabel')
         group_layout.addWidget(self.next_phase_lbl, alignment=Qt.AlignmentFlag.AlignLeft)
+        # ===== queue =====
+        # ----- group -----
+        self.queue_group.setObjectName('queueGroup')
+        self.queue_group.setVisible(False)
+        layout.addWidget(self.queue_group, alignment=Qt.AlignmentFlag.AlignLeft)
+        # ----- group_layout -----
+        group_layout = QHBoxLayout(self.queue_group)
+        group_layout.setContentsMargins(0, 0, 0, 0)
+        group_layout.setSpacing(5)
+        # ----- label -----
+        label = QLabel('Queued:')
+        label.setObjectName('queueLabel')
+        group_layout.addWidget(label, alignment=Qt.AlignmentFlag.AlignLeft)
+        # ----- value_label -----
+        self.queue_lbl.setObjectName('queueValueLabel')
+        group_layout.addWidget(self.queue_lbl, alignment=Qt.AlignmentFlag.AlignLeft)
+        # ----- clear_button -----
+        self.queue_clear_btn.setObjectName('queueClearButton')
+        self.queue_clear_btn.clicked.connect(self.state.clear_queue)
+        group_layout.addWidget(self.queue_clear_btn, alignment=Qt.AlignmentFlag.AlignLeft)
+        # ===== deadline missed =====
+        self.deadline_missed_lbl.setObjectName('deadlineMissedLabel')
+        self.deadline_missed_lbl.setVisible(False)
+        layout.addWidget(self.deadline_missed_lbl, alignment=Qt.AlignmentFlag.AlignLeft)
 
     def __init_listeners(self):
         self.state.current_phase_changed.connect(self.__on_current_phase_changed)
-        self.state.current_phase_elapsed_changed.connect(self.__on_current_phase_changed)
+        self.state.running_changed.connect(self.__on_running_changed)
+        self.refresh_timer.timeout.connect(self.__on_refresh)
         self.state.minutes_before_target_changed.connect(self.__on_minutes_before_target_changed)
         self.state.next_phase_changed.connect(self.__on_next_phase_changed)
+        self.state.deadline_missed.connect(self.__on_deadline_missed)
+        self.state.queue_changed.connect(self.__on_queue_changed)
 
     def __on_current_phase_changed(self):
-        current_phase = self.state.current_phase
-        current_phase_elapsed = self.state.current_phase_elapsed
-        text = self.__format_time(current_phase - current_phase_elapsed)
+        self.__set_current_phase_text(self.__format_time(self.state.current_phase_remaining))
+
+    def __on_refresh(self):
+        # pulls the latest remaining time; in display-rate mode the label is only touched when
+        # the text actually changes, so frames with nothing new cost no relayout or repaint
+        self.__frames += 1
+        text = self.__format_time(self.state.current_phase_remaining)
+        if text == self.__current_phase_text:
+            self.__redundant_updates += 1
+            if self.__coalesce:
+                return
+        self.__set_current_phase_text(text)
+
+    def __set_current_phase_text(self, text: str):
+        self.__current_phase_text = text
         self.current_phase_lbl.setText(text)
 
+    def __on_running_changed(self, running: bool):
+        # the display refreshes on its own cadence, independent of how often the runner wakes
+        self.queue_clear_btn.setEnabled(not running)
+        if running:
+            self.deadline_missed_lbl.setVisible(False)
+            self.__start_refresh_timer()
+        else:
+            self.refresh_timer.stop()
+            self.__log_render_stats()
+            self.__on_current_phase_changed()
+
+    def __start_refresh_timer(self):
+        self.__frames = 0
+        self.__redundant_updates = 0
+        self.__render_start = time.perf_counter_ns()
+        if self.timer_settings.render_mode.get() == RenderMode.DISPLAY_RATE:
+            screen = self.screen()
+            refresh_rate = screen.refreshRate() if screen is not None else 0
+            if refresh_rate <= 0:
+                refresh_rate = self.DEFAULT_REFRESH_RATE
+            self.__coalesce = True
+            self.refresh_timer.setTimerType(Qt.TimerType.PreciseTimer)
+            self.refresh_timer.start(max(1, round(1000 / refresh_rate)))
+        else:
+            self.__coalesce = False
+            self.refresh_timer.setTimerType(Qt.TimerType.CoarseTimer)
+            self.refresh_timer.start(self.timer_settings.refresh_interval.get())
+
+    def __log_render_stats(self):
+        seconds = (time.perf_counter_ns() - self.__render_start) / 1_000_000_000
+        if self.__frames and seconds > 0:
+            logging.info(f'> INFO: TimerWidget#render: {self.__frames} frames ({self.__frames / seconds:.1f}/s), '
+                         f'{self.__redundant_updates / seconds:.1f} redundant/s '
+                         f'({"skipped" if self.__coalesce else "applied"})')
+
     def __on_minutes_before_target_changed(self, new_value: int):
         self.minutes_before_target_lbl.setText(str(new_value))
 
-    def __on_next_phase_changed(self, new_value: float):
+    def __on_next_phase_changed(self, new_value: int):
         self.next_phase_lbl.setText(self.__format_time(new_value))
 
-    @staticmethod
-    def __format_time(milliseconds: int | float) -> str:
-        if isinstance(milliseconds, float):
-            milliseconds = int(milliseconds)
+    def __on_queue_changed(self, queue: list[tuple[int, ...]]):
+        # each queued plan is shown by its total length
+        self.queue_lbl.setText(', '.join(self.__format_time(sum(phases)) for phases in queue))
+        self.queue_group.setVisible(bool(queue))
 
+    def __on_deadline_missed(self, lateness: int):
+        # the warning stays up until the next run starts, so an aborted attempt is still explained
+        self.deadline_missed_lbl.setText(f'Deadline missed by {lateness / 1_000_000:.1f}ms')
+        self.deadline_missed_lbl.setVisible(True)
+
+    @staticmethod
+    def __format_time(nanoseconds: int) -> str:
+        milliseconds = nanoseconds // 1_000_000
         seconds = milliseconds // 1000
         milliseconds_part = milliseconds % 1000
         return f'{seconds}:{milliseconds_part:03d}'
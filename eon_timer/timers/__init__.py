@@ -5,6 +5,8 @@ from .delay_timer import DelayTimer
 from .enhanced_entralink_timer import EnhancedEntralinkTimer
 from .entralink_timer import EntralinkTimer
 from .frame_timer import FrameTimer
+from .phase_factory import PhaseFactory
+from .plan import Plan, create_plan
 from .second_timer import SecondTimer
 
 MINIMUM_LENGTH: Final[int] = 14000
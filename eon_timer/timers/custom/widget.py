@@ -5,7 +5,7 @@ from PySide6.QtCore import Signal
 from PySide6.QtGui import Qt
 from PySide6.QtWidgets import QWidget, QPushButton, QVBoxLayout, QSizePolicy, QScrollArea, QFrame
 
-from eon_timer.timers import Calibrator
+from eon_timer.timers import Calibrator, PhaseFactory
 from eon_timer.util import pyside
 from eon_timer.util.injector import component
 from .custom_phase import CustomPhase
@@ -19,10 +19,12 @@ class CustomTimerWidget(QWidget):
 
     def __init__(self,
                  model: CustomTimerModel,
-                 calibrator: Calibrator):
+                 calibrator: Calibrator,
+                 phase_factory: PhaseFactory):
         super().__init__()
         self.model: Final[CustomTimerModel] = model
         self.calibrator: Final[Calibrator] = calibrator
+        self.phase_factory: Final[PhaseFactory] = phase_factory
 
         self.__container_layout = QVBoxLayout()
         self.__init_components()
@@ -71,16 +73,8 @@ class CustomTimerWidget(QWidget):
         pyside.set_class(button, ['success'])
         layout.addWidget(button, stretch=0, alignment=Qt.AlignmentFlag.AlignBottom)
 
-    def create_phases(self) -> list[int]:
-        phases = []
-        for phase in self.model.phases:
-            unit = phase.unit.get()
-            value = phase.target.get()
-            if unit == CustomPhase.Unit.ADVANCES or unit == CustomPhase.Unit.HEX:
-                value = self.calibrator.to_milliseconds(value)
-            value += phase.calibration.get()
-            phases.append(value)
-        return phases
+    def create_phases(self) -> list[float]:
+        return self.phase_factory.custom(self.model)
 
     def calibrate(self):
         for i in range(self.__container_layout.count()):
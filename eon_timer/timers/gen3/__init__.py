@@ -1,2 +1 @@
 from .model import Gen3Model
-from .widget import Gen3TimerWidget
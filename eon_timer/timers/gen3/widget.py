@@ -5,7 +5,8 @@ from typing import Final
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import QGroupBox, QPushButton, QSizePolicy, QSpinBox, QDoubleSpinBox
 
-from eon_timer.timers import FrameTimer
+from eon_timer.app_state import AppState
+from eon_timer.timers import FrameTimer, PhaseFactory
 from eon_timer.util import const, pyside
 from eon_timer.util.injector import component
 from eon_timer.util.properties import bindings
@@ -18,6 +19,7 @@ from .model import Gen3Mode, Gen3Model
 @component()
 class Gen3TimerWidget(FormWidget):
     timer_changed: Final[Signal] = Signal()
+    target_frame_set: Final[Signal] = Signal()
 
     class Field(FormWidget.Field):
         MODE = 'Mode'
@@ -29,10 +31,14 @@ class Gen3TimerWidget(FormWidget):
 
     def __init__(self,
                  model: Gen3Model,
-                 frame_timer: FrameTimer) -> None:
+                 frame_timer: FrameTimer,
+                 phase_factory: PhaseFactory,
+                 state: AppState) -> None:
         super().__init__(None)
         self.model: Final[Gen3Model] = model
         self.frame_timer: Final[FrameTimer] = frame_timer
+        self.phase_factory: Final[PhaseFactory] = phase_factory
+        self.state: Final[AppState] = state
         self.__init_components()
         self.__init_listeners()
 
@@ -72,10 +78,10 @@ class Gen3TimerWidget(FormWidget):
         # ----- set_target_frame_btn -----
         field = QPushButton(self.Field.SET_TARGET_FRAME.value)
         field.setObjectName('gen3SetTargetFrameButton')
-        field_set = self.add_field(self.Field.SET_TARGET_FRAME, field,
-                                   layout=form_layout,
-                                   with_label=False)
-        field_set.enabled = False
+        field.clicked.connect(self.target_frame_set)
+        self.add_field(self.Field.SET_TARGET_FRAME, field,
+                       layout=form_layout,
+                       with_label=False)
         # ----- frame_hit -----
         field = QSpinBox()
         field.setRange(0, const.INT_MAX)
@@ -103,13 +109,11 @@ class Gen3TimerWidget(FormWidget):
         # calibration
         handler = functools.partial(field_changed, self.Field.CALIBRATION)
         self.model.calibration.on_change(handler)
+        # running
+        self.state.running_changed.connect(self.__on_running_changed)
 
     def create_phases(self) -> list[float]:
-        return self.frame_timer.create(
-            self.model.pre_timer.get(),
-            self.model.target_frame.get(),
-            self.model.calibration.get()
-        )
+        return self.phase_factory.gen3(self.model)
 
     def calibrate(self):
         if self.model.frame_hit.get() > 0:
@@ -120,6 +124,15 @@ class Gen3TimerWidget(FormWidget):
             self.model.calibration.add(offset)
             self.model.frame_hit.set(0)
 
+    def __on_running_changed(self, running: bool):
+        # every field is editable between runs; in variable target mode the target frame stays
+        # editable during a run so it can be pushed to the run in progress
+        variable_target = self.model.mode.get() == Gen3Mode.VARIABLE_TARGET
+        for field in self.Field:
+            enabled = not running or (variable_target and field in (self.Field.TARGET_FRAME,
+                                                                    self.Field.SET_TARGET_FRAME))
+            self.set_enabled(field, enabled)
+
     def __on_mode_changed(self, event: PropertyChangeEvent[Gen3Mode]) -> None:
         self.set_visible(self.Field.SET_TARGET_FRAME,
                          event.new_value == Gen3Mode.VARIABLE_TARGET)
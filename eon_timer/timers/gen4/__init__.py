@@ -1,2 +1 @@
 from .model import Gen4Model
-from .widget import Gen4TimerWidget
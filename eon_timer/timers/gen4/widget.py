@@ -5,7 +5,7 @@ from typing import Final
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import QGroupBox, QSizePolicy, QSpinBox
 
-from eon_timer.timers import Calibrator, DelayTimer
+from eon_timer.timers import Calibrator, DelayTimer, PhaseFactory
 from eon_timer.util import const, pyside
 from eon_timer.util.injector import component
 from eon_timer.util.properties import bindings
@@ -28,11 +28,13 @@ class Gen4TimerWidget(FormWidget):
     def __init__(self,
                  model: Gen4Model,
                  calibrator: Calibrator,
-                 delay_timer: DelayTimer) -> None:
+                 delay_timer: DelayTimer,
+                 phase_factory: PhaseFactory) -> None:
         super().__init__(None)
         self.model: Final[Gen4Model] = model
         self.calibrator: Final[Calibrator] = calibrator
         self.delay_timer: Final[DelayTimer] = delay_timer
+        self.phase_factory: Final[PhaseFactory] = phase_factory
         self.__init_components()
         self.__init_listeners()
 
@@ -95,11 +97,7 @@ class Gen4TimerWidget(FormWidget):
         self.model.calibrated_second.on_change(handler)
 
     def create_phases(self) -> list[float]:
-        return self.delay_timer.create(
-            self.model.target_delay.get(),
-            self.model.target_second.get(),
-            self.get_calibration()
-        )
+        return self.phase_factory.gen4(self.model)
 
     def calibrate(self):
         if self.model.delay_hit.get() > 0:
@@ -113,7 +111,4 @@ class Gen4TimerWidget(FormWidget):
             self.model.delay_hit.set(0)
 
     def get_calibration(self) -> float:
-        return self.calibrator.create_calibration(
-            self.model.calibrated_delay.get(),
-            self.model.calibrated_second.get()
-        )
+        return self.phase_factory.gen4_calibration(self.model)
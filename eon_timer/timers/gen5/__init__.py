@@ -1,2 +1 @@
 from .model import Gen5Model
-from .widget import Gen5TimerWidget
@@ -5,7 +5,7 @@ from typing import Final
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import QSizePolicy, QSpinBox, QScrollArea, QWidget, QVBoxLayout, QFrame
 
-from eon_timer.timers import Calibrator, DelayTimer, SecondTimer, EntralinkTimer, EnhancedEntralinkTimer
+from eon_timer.timers import Calibrator, DelayTimer, SecondTimer, EntralinkTimer, EnhancedEntralinkTimer, PhaseFactory
 from eon_timer.util import const, pyside
 from eon_timer.util.injector import component
 from eon_timer.util.properties import bindings
@@ -40,7 +40,8 @@ class Gen5TimerWidget(FormWidget):
                  delay_timer: DelayTimer,
                  second_timer: SecondTimer,
                  entralink_timer: EntralinkTimer,
-                 enhanced_entralink_timer: EnhancedEntralinkTimer) -> None:
+                 enhanced_entralink_timer: EnhancedEntralinkTimer,
+                 phase_factory: PhaseFactory) -> None:
         super().__init__(None)
         self.model: Final[Gen5Model] = model
         self.calibrator: Final[Calibrator] = calibrator
@@ -48,6 +49,7 @@ class Gen5TimerWidget(FormWidget):
         self.second_timer: Final[SecondTimer] = second_timer
         self.entralink_timer: Final[EntralinkTimer] = entralink_timer
         self.enhanced_entralink_timer: Final[EnhancedEntralinkTimer] = enhanced_entralink_timer
+        self.phase_factory: Final[PhaseFactory] = phase_factory
         self.__init_components()
         self.__init_listeners()
 
@@ -185,27 +187,7 @@ class Gen5TimerWidget(FormWidget):
                          event.new_value == Gen5Mode.ENTRALINK_PLUS)
 
     def create_phases(self) -> list[float]:
-        calibration = self.calibrator.calibrate_to_milliseconds(self.model.calibration.get())
-        entralink_calibration = self.calibrator.calibrate_to_milliseconds(self.model.entralink_calibration.get())
-        match self.model.mode.get():
-            case Gen5Mode.STANDARD:
-                return self.second_timer.create(self.model.target_second.get(), calibration)
-            case Gen5Mode.C_GEAR:
-                return self.delay_timer.create(self.model.target_delay.get(),
-                                               self.model.target_second.get(),
-                                               calibration)
-            case Gen5Mode.ENTRALINK:
-                return self.entralink_timer.create(self.model.target_delay.get(),
-                                                   self.model.target_second.get(),
-                                                   calibration,
-                                                   entralink_calibration)
-            case Gen5Mode.ENTRALINK_PLUS:
-                return self.enhanced_entralink_timer.create(self.model.target_delay.get(),
-                                                            self.model.target_second.get(),
-                                                            self.model.target_advances.get(),
-                                                            calibration,
-                                                            entralink_calibration,
-                                                            self.model.frame_calibration.get())
+        return self.phase_factory.gen5(self.model)
 
     def calibrate(self):
         if self.__can_calibrate():
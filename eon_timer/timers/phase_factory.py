@@ -0,0 +1,87 @@
+from typing import Final
+
+from eon_timer.util.injector import component
+from .calibrator import Calibrator
+from .custom.custom_phase import CustomPhase
+from .custom.model import CustomTimerModel
+from .delay_timer import DelayTimer
+from .enhanced_entralink_timer import EnhancedEntralinkTimer
+from .entralink_timer import EntralinkTimer
+from .frame_timer import FrameTimer
+from .gen3.model import Gen3Model
+from .gen4.model import Gen4Model
+from .gen5.model import Gen5Model, Gen5Mode
+from .second_timer import SecondTimer
+
+
+@component()
+class PhaseFactory:
+    """ Builds phase durations in milliseconds from the timer models, with or without their widgets """
+
+    def __init__(self,
+                 calibrator: Calibrator,
+                 frame_timer: FrameTimer,
+                 delay_timer: DelayTimer,
+                 second_timer: SecondTimer,
+                 entralink_timer: EntralinkTimer,
+                 enhanced_entralink_timer: EnhancedEntralinkTimer):
+        self.calibrator: Final[Calibrator] = calibrator
+        self.frame_timer: Final[FrameTimer] = frame_timer
+        self.delay_timer: Final[DelayTimer] = delay_timer
+        self.second_timer: Final[SecondTimer] = second_timer
+        self.entralink_timer: Final[EntralinkTimer] = entralink_timer
+        self.enhanced_entralink_timer: Final[EnhancedEntralinkTimer] = enhanced_entralink_timer
+
+    def gen3(self, model: Gen3Model) -> list[float]:
+        return self.frame_timer.create(
+            model.pre_timer.get(),
+            model.target_frame.get(),
+            model.calibration.get()
+        )
+
+    def gen4(self, model: Gen4Model) -> list[float]:
+        return self.delay_timer.create(
+            model.target_delay.get(),
+            model.target_second.get(),
+            self.gen4_calibration(model)
+        )
+
+    def gen4_calibration(self, model: Gen4Model) -> float:
+        return self.calibrator.create_calibration(
+            model.calibrated_delay.get(),
+            model.calibrated_second.get()
+        )
+
+    def gen5(self, model: Gen5Model) -> list[float]:
+        calibration = self.calibrator.calibrate_to_milliseconds(model.calibration.get())
+        entralink_calibration = self.calibrator.calibrate_to_milliseconds(model.entralink_calibration.get())
+        match model.mode.get():
+            case Gen5Mode.STANDARD:
+                return self.second_timer.create(model.target_second.get(), calibration)
+            case Gen5Mode.C_GEAR:
+                return self.delay_timer.create(model.target_delay.get(),
+                                               model.target_second.get(),
+                                               calibration)
+            case Gen5Mode.ENTRALINK:
+                return self.entralink_timer.create(model.target_delay.get(),
+                                                   model.target_second.get(),
+                                                   calibration,
+                                                   entralink_calibration)
+            case Gen5Mode.ENTRALINK_PLUS:
+                return self.enhanced_entralink_timer.create(model.target_delay.get(),
+                                                            model.target_second.get(),
+                                                            model.target_advances.get(),
+                                                            calibration,
+                                                            entralink_calibration,
+                                                            model.frame_calibration.get())
+
+    def custom(self, model: CustomTimerModel) -> list[float]:
+        phases = []
+        for phase in model.phases:
+            unit = phase.unit.get()
+            value = phase.target.get()
+            if unit == CustomPhase.Unit.ADVANCES or unit == CustomPhase.Unit.HEX:
+                value = self.calibrator.to_milliseconds(value)
+            value += phase.calibration.get()
+            phases.append(value)
+        return phases
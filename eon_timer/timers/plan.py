@@ -0,0 +1,15 @@
+from typing import Final
+
+NANOSECONDS_PER_MILLISECOND: Final[int] = 1_000_000
+
+Plan = tuple[int, ...]
+
+
+def create_plan(phases: list[int | float]) -> Plan:
+    """
+    Converts the calculators' phase durations from milliseconds to integer nanoseconds.
+    This is the only place a plan is rounded: every phase is rounded once to the nearest
+    nanosecond (ties to even), and everything downstream works in exact integer nanoseconds.
+    A calibration can push a phase below zero; such a phase is clamped to zero, ending as soon as it starts.
+    """
+    return tuple(max(0, round(phase * NANOSECONDS_PER_MILLISECOND)) for phase in phases)
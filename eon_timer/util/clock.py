@@ -1,17 +1,180 @@
+import functools
 import time
+from dataclasses import dataclass
+from typing import Callable, Final, Optional
+
+# ----- clock sources -----
+PERF_COUNTER: Final[str] = 'perf_counter_ns'
+MONOTONIC: Final[str] = 'monotonic_ns'
+MONOTONIC_RAW: Final[str] = 'CLOCK_MONOTONIC_RAW'
+BOOTTIME: Final[str] = 'CLOCK_BOOTTIME'
+
+
+def _create_sources() -> dict[str, Callable[[], int]]:
+    sources = {PERF_COUNTER: time.perf_counter_ns, MONOTONIC: time.monotonic_ns}
+    for name in (MONOTONIC_RAW, BOOTTIME):
+        clock_id = getattr(time, name, None)
+        if clock_id is None:
+            continue
+        try:
+            time.clock_gettime_ns(clock_id)
+        except OSError:
+            continue
+        sources[name] = functools.partial(time.clock_gettime_ns, clock_id)
+    return sources
+
+
+# every source readable on this platform, by name
+SOURCES: Final[dict[str, Callable[[], int]]] = _create_sources()
+_source_name: str = PERF_COUNTER
+_source: Callable[[], int] = time.perf_counter_ns
+
+
+def current_source() -> Callable[[], int]:
+    """ The process-wide time source that clocks, the engine and the app state read """
+    return _source
+
+
+def current_source_name() -> str:
+    return _source_name
+
+
+def use_source(name: str) -> Callable[[], int]:
+    """ Selects the process-wide time source; only to be called while no run is in progress """
+    global _source, _source_name
+    if name not in SOURCES:
+        raise ValueError(f'clock source {name} is not available on this platform')
+    _source_name, _source = name, SOURCES[name]
+    return _source
+
+
+def now_ns() -> int:
+    """ Current time on the selected source, in nanoseconds """
+    return _source()
 
 
 class Clock:
-    def __init__(self):
-        now = time.perf_counter_ns()
-        self.__initial_tick = now
-        self.__last_tick = now
-
-    def tick(self) -> float:
-        now = time.perf_counter_ns()
-        delta = now - self.__last_tick
-        self.__last_tick = now
-        return float(delta) / 1_000_000
-
-    def since_start(self) -> float:
-        return (time.perf_counter_ns() - self.__initial_tick) / 1_000_000
+    def __init__(self, initial_tick: Optional[int] = None, now: Optional[Callable[[], int]] = None):
+        """ `now` is the time source in nanoseconds; the selected source unless running against a virtual clock """
+        now = now or _source
+        self.__now: Final[Callable[[], int]] = now
+        self.__initial_tick: Final[int] = now() if initial_tick is None else initial_tick
+
+    @property
+    def source(self) -> Callable[[], int]:
+        return self.__now
+
+    @property
+    def initial_tick(self) -> int:
+        return self.__initial_tick
+
+    def elapsed_ns(self) -> int:
+        return self.__now() - self.__initial_tick
+
+    def to_ns(self, offset: int) -> int:
+        """ Converts an offset in nanoseconds from the start of the clock to an absolute value on its source """
+        return self.__initial_tick + offset
+
+
+NANOSECONDS_PER_SECOND: Final[int] = 1_000_000_000
+
+
+def sample_wall_clock(samples: int = 8) -> tuple[int, int, int]:
+    """
+    Pairs a time_ns() reading with the reading of the selected source taken at the same instant.
+    Returns (wall_ns, perf_ns, uncertainty_ns) from the tightest of `samples` brackets.
+    """
+    now = _source
+    best: Optional[tuple[int, int, int]] = None
+    for _ in range(samples):
+        before = now()
+        wall = time.time_ns()
+        after = now()
+        uncertainty = (after - before) // 2
+        if best is None or uncertainty < best[2]:
+            best = (wall, before + uncertainty, uncertainty)
+    return best
+
+
+def next_second_boundary(offset: int = 0, margin: int = 0) -> tuple[int, int, int]:
+    """
+    Finds the next wall-clock second boundary plus `offset` ns that is at least `margin` ns away.
+    Returns (wall_ns, perf_ns, uncertainty_ns) of that instant.
+    """
+    wall, perf, uncertainty = sample_wall_clock()
+    boundary = (wall + margin - offset) // NANOSECONDS_PER_SECOND * NANOSECONDS_PER_SECOND + NANOSECONDS_PER_SECOND
+    boundary += offset
+    return boundary, perf + boundary - wall, uncertainty
+
+
+# ----- calibration -----
+@dataclass(frozen=True)
+class SourceReport:
+    name: str
+    # cost of one read in nanoseconds, without the loop around it
+    overhead: int
+    # smallest step the source was seen to take between two reads, in nanoseconds
+    resolution: int
+
+    @property
+    def granularity(self) -> int:
+        """ How finely two timestamps from this source can be told apart """
+        return max(self.overhead, self.resolution, 1)
+
+    def __str__(self) -> str:
+        return f'{self.name}: {self.overhead}ns/read, {self.resolution}ns resolution'
+
+
+def measure_source(name: str, reads: int = 10_000, steps: int = 200) -> SourceReport:
+    """ Times `reads` back-to-back reads of a source, then watches it tick over `steps` times """
+    now = SOURCES[name]
+    loop = range(reads)
+    start = time.perf_counter_ns()
+    for _ in loop:
+        pass
+    empty = time.perf_counter_ns() - start
+    start = time.perf_counter_ns()
+    for _ in loop:
+        now()
+    overhead = max(0, time.perf_counter_ns() - start - empty) // reads
+    resolution = None
+    last = now()
+    for _ in range(steps):
+        value = now()
+        while value == last:
+            value = now()
+        if resolution is None or value - last < resolution:
+            resolution = value - last
+        last = value
+    return SourceReport(name, overhead, resolution)
+
+
+def measure_sources() -> dict[str, SourceReport]:
+    return {name: measure_source(name) for name in SOURCES}
+
+
+def pick_source(reports: dict[str, SourceReport]) -> str:
+    """ The first source in SOURCES whose granularity is within 10% of the finest, so noise does not flip the pick """
+    finest = min(report.granularity for report in reports.values())
+    return next(report.name for report in reports.values() if report.granularity * 10 <= finest * 11)
+
+
+def sample_sources(samples: int = 8) -> dict[str, int]:
+    """ Reads every source back to back, keeping the pass that took the least time """
+    best: Optional[tuple[int, dict[str, int]]] = None
+    for _ in range(samples):
+        start = time.perf_counter_ns()
+        readings = {name: now() for name, now in SOURCES.items()}
+        span = time.perf_counter_ns() - start
+        if best is None or span < best[0]:
+            best = (span, readings)
+    return best[1]
+
+
+def drift_ppm(start: dict[str, int], end: dict[str, int], reference: str) -> dict[str, float]:
+    """ How much faster each source ran than `reference` between two samples, in parts per million """
+    elapsed = end[reference] - start[reference]
+    if elapsed <= 0:
+        return {}
+    return {name: ((end[name] - start[name]) - elapsed) / elapsed * 1_000_000
+            for name in start if name != reference and name in end}
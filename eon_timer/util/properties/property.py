@@ -1,3 +1,4 @@
+import copy
 from typing import TypeVar, Generic, Self, Type, Final
 
 from .property_change import PropertyChangeEvent, PropertyChangeListener
@@ -18,6 +19,12 @@ class Property(Generic[T]):
         self.__transient = transient
         self._value = initial_value
 
+    def copy(self) -> Self:
+        """ An independent property with the same value and no listeners """
+        other = copy.copy(self)
+        other.__change_listeners = []
+        return other
+
     def dispose(self):
         self.__change_listeners.clear()
 
@@ -16,11 +16,13 @@ class Settings(QObject, CloseListener):
         self.settings: Final[QSettings] = settings
         self.__properties: Final[dict[str, Property]] = {}
 
-        self_type = type(self)
-        for name, value in self_type.__dict__.items():
+        # the class attributes are templates; every instance binds its own copies, so two models
+        # over different QSettings never share values or listeners
+        for name, value in type(self).__dict__.items():
             if isinstance(value, Property):
-                self.__properties[name] = value
-                setattr(self, name, value)
+                prop = value.copy()
+                self.__properties[name] = prop
+                setattr(self, name, prop)
         self._deserialize()
 
     def _deserialize(self):
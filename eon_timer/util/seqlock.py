@@ -0,0 +1,38 @@
+import threading
+import time
+from array import array
+from typing import Final
+
+
+class Seqlock:
+    """
+    A fixed record of int64 fields that readers copy without taking a lock. Writers make the
+    sequence counter odd while they write, and readers retry until they see the same even
+    counter before and after their copy.
+    """
+
+    def __init__(self, fields: int):
+        self.__data: Final[array] = array('q', bytes(8 * (fields + 1)))
+        self.__fields: Final[int] = fields
+        self.__write_lock: Final[threading.Lock] = threading.Lock()
+
+    def write(self, *values: int, start: int = 0):
+        """ Publishes `values` into consecutive fields beginning at `start` """
+        data = self.__data
+        with self.__write_lock:
+            data[0] += 1
+            for offset, value in enumerate(values, start + 1):
+                data[offset] = value
+            data[0] += 1
+
+    def read(self) -> tuple[int, ...]:
+        data = self.__data
+        while True:
+            sequence = data[0]
+            if sequence & 1:
+                # let the writer finish instead of spinning through its GIL slice
+                time.sleep(0)
+                continue
+            values = tuple(data[1:self.__fields + 1])
+            if data[0] == sequence:
+                return values
@@ -0,0 +1,221 @@
+import gc
+import tracemalloc
+from typing import Final, override
+
+import pytest
+
+from eon_timer.engine.engine import EngineListener, EngineRun, PhaseEngine, RunPlan, RunStats
+from eon_timer.engine.timeline import EventKind, Timeline
+from eon_timer.engine.virtual import VirtualBackend, VirtualClock
+from eon_timer.settings.timer.model import MissPolicy, TimerBackend, WaitPolicy
+from eon_timer.timers.plan import NANOSECONDS_PER_MILLISECOND, create_plan
+from eon_timer.util.clock import Clock
+
+# every wait returns this late, the way a real sleep overshoots its deadline
+OVERSLEEP: Final[int] = 300_000
+
+
+class LateBackend(VirtualBackend):
+    @override
+    def wait_until(self, deadline_ns: int) -> bool:
+        return super().wait_until(deadline_ns + OVERSLEEP)
+
+
+class StatsListener(EngineListener):
+    def __init__(self):
+        self.stats: RunStats | None = None
+
+    @override
+    def on_run_finished(self, stats: RunStats):
+        self.stats = stats
+
+
+class SnapshotListener(StatsListener):
+    """
+    Traces allocations from the start of the run, so the blocks freed while compiling the
+    timeline are not counted, and snapshots them at two phase ends once the run has settled
+    """
+
+    def __init__(self, first: int, last: int):
+        super().__init__()
+        self.first: Final[int] = first
+        self.last: Final[int] = last
+        self.phase_ends = 0
+        self.snapshots: list[tracemalloc.Snapshot] = []
+
+    @override
+    def on_run_started(self, start_latency: int):
+        tracemalloc.start()
+
+    @override
+    def on_phase_end(self, phase_start: int, ended_at: int):
+        self.phase_ends += 1
+        if self.phase_ends in (self.first, self.last):
+            # a full collection also empties the interpreter's free lists, whose blocks stay traced
+            gc.collect()
+            self.snapshots.append(tracemalloc.take_snapshot())
+
+
+class BoundaryListener(StatsListener):
+    def __init__(self):
+        super().__init__()
+        self.lateness: list[int] = []
+
+    @override
+    def on_phase_end(self, phase_start: int, ended_at: int):
+        # the run's clock starts at 0, so the deadline is the offset itself
+        self.lateness.append(ended_at - phase_start)
+
+
+class TraceListener(StatsListener):
+    """ Writes the run's actions and phase ends, tagged with `name`, into a trace shared between runs """
+
+    def __init__(self, name: str, trace: list[tuple[str, str, int]]):
+        super().__init__()
+        self.name: Final[str] = name
+        self.trace: Final[list[tuple[str, str, int]]] = trace
+
+    @override
+    def on_action(self, fired_at: int):
+        self.trace.append((self.name, 'action', fired_at // NANOSECONDS_PER_MILLISECOND))
+
+    @override
+    def on_phase_end(self, phase_start: int, ended_at: int):
+        self.trace.append((self.name, 'phase_end', ended_at // NANOSECONDS_PER_MILLISECOND))
+
+
+class StoppingListener(TraceListener):
+    """ Stops its own run at the end of the first phase """
+
+    def __init__(self, name: str, trace: list[tuple[str, str, int]]):
+        super().__init__(name, trace)
+        self.run: EngineRun | None = None
+
+    def attach(self, run: EngineRun) -> EngineRun:
+        self.run = run
+        return run
+
+    @override
+    def on_phase_end(self, phase_start: int, ended_at: int):
+        super().on_phase_end(phase_start, ended_at)
+        self.run.stop()
+
+
+def create_run_plan(phases: list[float],
+                    action_count: int = 6,
+                    wait_policy: WaitPolicy = WaitPolicy.ADAPTIVE) -> RunPlan:
+    return RunPlan(Timeline.compile(create_plan(phases), action_count, 500),
+                   TimerBackend.SLEEP,
+                   wait_policy,
+                   8 * NANOSECONDS_PER_MILLISECOND,
+                   0,
+                   50 * NANOSECONDS_PER_MILLISECOND,
+                   MissPolicy.FIRE,
+                   None,
+                   None)
+
+
+def run_phases(phase_count: int,
+               wait_policy: WaitPolicy,
+               listener: StatsListener | None = None) -> RunStats:
+    clock = VirtualClock()
+    engine = PhaseEngine(clock.now, LateBackend(clock))
+    phases = ([5000.0, 1234.5, 800.0] * phase_count)[:phase_count]
+    plan = create_run_plan(phases, wait_policy=wait_policy)
+    listener = listener or StatsListener()
+    engine.submit(EngineRun(Clock(0, clock.now), plan, listener))
+    engine.serve(until_idle=True)
+    assert listener.stats is not None and listener.stats.completed
+    assert len(listener.stats.trigger_errors) == plan.timeline.action_count
+    return listener.stats
+
+
+@pytest.mark.parametrize('wait_policy', list(WaitPolicy))
+def test_trigger_error_does_not_grow_with_phases(wait_policy: WaitPolicy):
+    # deadlines are absolute offsets from the start of the run, so a late wake in one phase is
+    # never carried into the next
+    single = max(run_phases(1, wait_policy).trigger_errors)
+    many = max(run_phases(60, wait_policy).trigger_errors)
+    assert single <= OVERSLEEP
+    assert many == single
+
+
+def test_run_loop_does_not_allocate():
+    # both snapshots are past the interpreter's cached small ints, so the run state holds the same objects
+    listener = SnapshotListener(300, 490)
+    try:
+        run_phases(500, WaitPolicy.ADAPTIVE, listener)
+    finally:
+        tracemalloc.stop()
+    before, after = listener.snapshots
+    engine = [tracemalloc.Filter(True, '*/eon_timer/engine/*')]
+    growth = after.filter_traces(engine).compare_to(before.filter_traces(engine), 'lineno')
+    assert sum(stat.size_diff for stat in growth) == 0, [str(stat) for stat in growth if stat.size_diff]
+
+
+def test_phase_end_reports_when_it_was_handled():
+    listener = BoundaryListener()
+    run_phases(5, WaitPolicy.FIXED, listener)
+    assert listener.lateness == [OVERSLEEP] * 5
+
+
+def test_overlapping_runs_fire_in_deadline_order():
+    clock = VirtualClock()
+    engine = PhaseEngine(clock.now, VirtualBackend(clock))
+    trace = []
+    first = TraceListener('first', trace)
+    second = TraceListener('second', trace)
+    engine.submit(EngineRun(Clock(0, clock.now), create_run_plan([1000.0, 1000.0], 2), first))
+    engine.submit(EngineRun(Clock(0, clock.now), create_run_plan([700.0, 700.0], 2), second))
+    engine.serve(until_idle=True)
+    assert trace == [('second', 'action', 200),
+                     ('first', 'action', 500),
+                     ('second', 'action', 700),
+                     ('second', 'phase_end', 700),
+                     ('second', 'action', 900),
+                     ('first', 'action', 1000),
+                     ('first', 'phase_end', 1000),
+                     ('second', 'action', 1400),
+                     ('second', 'phase_end', 1400),
+                     ('first', 'action', 1500),
+                     ('first', 'action', 2000),
+                     ('first', 'phase_end', 2000)]
+    assert first.stats.completed and second.stats.completed
+
+
+def test_stopping_one_run_leaves_the_other_running():
+    clock = VirtualClock()
+    engine = PhaseEngine(clock.now, VirtualBackend(clock))
+    trace = []
+    first = TraceListener('first', trace)
+    second = StoppingListener('second', trace)
+    engine.submit(EngineRun(Clock(0, clock.now), create_run_plan([1000.0, 1000.0], 2), first))
+    engine.submit(second.attach(EngineRun(Clock(0, clock.now), create_run_plan([700.0, 700.0], 2), second)))
+    engine.serve(until_idle=True)
+    assert trace == [('second', 'action', 200),
+                     ('first', 'action', 500),
+                     ('second', 'action', 700),
+                     ('second', 'phase_end', 700),
+                     ('first', 'action', 1000),
+                     ('first', 'phase_end', 1000),
+                     ('first', 'action', 1500),
+                     ('first', 'action', 2000),
+                     ('first', 'phase_end', 2000)]
+    assert first.stats.completed
+    assert not second.stats.completed
+    assert len(second.stats.trigger_errors) == 2
+
+
+def test_timeline_counts_down_to_each_phase_end():
+    timeline = Timeline.compile(create_plan([1000.0, 0.0, 300.0]), 3, 500)
+    assert [time // NANOSECONDS_PER_MILLISECOND for time in timeline.times] == [500, 1000, 1000, 1000, 1300, 1300]
+    # an action is only placed inside its phase, so the empty phase has none
+    assert list(timeline.kinds) == [EventKind.ACTION, EventKind.ACTION, EventKind.PHASE_END,
+                                    EventKind.PHASE_END, EventKind.ACTION, EventKind.PHASE_END]
+    assert timeline.action_count == 3
+
+
+def test_negative_phases_are_clamped_before_compiling():
+    assert create_plan([-20.5, 1000.0]) == (0, 1000 * NANOSECONDS_PER_MILLISECOND)
+    with pytest.raises(ValueError):
+        Timeline.compile((-1, 1000), 3, 500)
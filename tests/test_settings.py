@@ -0,0 +1,13 @@
+from PySide6.QtCore import QSettings
+
+from eon_timer.settings.timer.model import TimerSettingsModel
+
+
+def test_instances_do_not_share_properties(tmp_path):
+    first = TimerSettingsModel(QSettings(str(tmp_path / 'first.ini'), QSettings.Format.IniFormat))
+    second = TimerSettingsModel(QSettings(str(tmp_path / 'second.ini'), QSettings.Format.IniFormat))
+    changes = []
+    second.refresh_interval.on_change(changes.append)
+    first.refresh_interval.set(first.refresh_interval.get() + 1)
+    assert second.refresh_interval.get() == TimerSettingsModel.refresh_interval.initial_value
+    assert not changes
@@ -0,0 +1,202 @@
+import pytest
+from PySide6.QtCore import QSettings
+
+from eon_timer.engine.timeline import Timeline
+from eon_timer.phase_runner import PhaseRunner
+from eon_timer.settings.action.model import ActionSettingsModel
+from eon_timer.settings.advanced.model import AdvancedSettingsModel
+from eon_timer.settings.timer.model import Console, TimerSettingsModel
+from eon_timer.simulation import Simulation
+from eon_timer.timers import Calibrator, DelayTimer, EnhancedEntralinkTimer, EntralinkTimer, FrameTimer, \
+    PhaseFactory, SecondTimer
+from eon_timer.timers.custom.custom_phase import CustomPhase
+from eon_timer.timers.custom.model import CustomTimerModel
+from eon_timer.timers.gen3.model import Gen3Model
+from eon_timer.timers.gen4.model import Gen4Model
+from eon_timer.timers.gen5.model import Gen5Model, Gen5Mode
+from eon_timer.timers.plan import NANOSECONDS_PER_MILLISECOND, create_plan
+
+
+@pytest.fixture
+def settings(tmp_path) -> QSettings:
+    return QSettings(str(tmp_path / 'settings.ini'), QSettings.Format.IniFormat)
+
+
+@pytest.fixture
+def timer_settings(settings: QSettings) -> TimerSettingsModel:
+    timer_settings = TimerSettingsModel(settings)
+    # a whole number of milliseconds per frame keeps the expected phases readable
+    timer_settings.console.set(Console.CUSTOM)
+    timer_settings.custom_framerate.set(16.0)
+    return timer_settings
+
+
+@pytest.fixture
+def simulation(settings: QSettings, timer_settings: TimerSettingsModel) -> Simulation:
+    return Simulation(timer_settings,
+                      ActionSettingsModel(settings),
+                      AdvancedSettingsModel(settings))
+
+
+@pytest.fixture
+def phase_factory(timer_settings: TimerSettingsModel) -> PhaseFactory:
+    calibrator = Calibrator(timer_settings)
+    second_timer = SecondTimer()
+    delay_timer = DelayTimer(calibrator, second_timer)
+    entralink_timer = EntralinkTimer(delay_timer)
+    return PhaseFactory(calibrator,
+                        FrameTimer(calibrator),
+                        delay_timer,
+                        second_timer,
+                        entralink_timer,
+                        EnhancedEntralinkTimer(entralink_timer))
+
+
+def run_actions(simulation: Simulation, phases: list[float]) -> list[int]:
+    actions = []
+    simulation.state.action_triggered.connect(actions.append)
+    simulation.run(create_plan(phases))
+    return actions
+
+
+def counted_down_to(*phase_ends_ms: int) -> list[int]:
+    """ The default six actions, 500ms apart, ending on each phase end """
+    return [(end - offset) * NANOSECONDS_PER_MILLISECOND
+            for end in phase_ends_ms
+            for offset in range(2500, -1, -500)]
+
+
+def test_queued_plan_runs_its_own_phases(simulation: Simulation):
+    phases = []
+    simulation.state.phases_changed.connect(phases.append)
+    simulation.run(create_plan([1000.0]), create_plan([300.0, 300.0]))
+    assert phases[-1] == list(create_plan([300.0, 300.0]))
+    # the queued plan replaying the first one would end at 2000ms
+    assert simulation.now == 1600 * NANOSECONDS_PER_MILLISECOND
+    assert not simulation.state.running
+
+
+def test_shifted_deadline_is_shown_once_applied(simulation: Simulation):
+    phases = []
+    shifted = []
+
+    def shift_once(_):
+        if not shifted:
+            simulation.runner.shift_deadline(500 * NANOSECONDS_PER_MILLISECOND)
+            shifted.append(simulation.state.phases)
+
+    simulation.state.action_triggered.connect(shift_once)
+    simulation.state.phases_changed.connect(phases.append)
+    simulation.run(create_plan([1000.0, 1000.0]))
+    # nothing changes on screen until the engine has taken the adjustment
+    assert shifted == [create_plan([1000.0, 1000.0])]
+    assert phases[-1] == list(create_plan([1500.0, 1000.0]))
+    assert simulation.now == 2500 * NANOSECONDS_PER_MILLISECOND
+
+
+def test_phase_progress_is_read_on_the_virtual_clock(simulation: Simulation):
+    progress = []
+    simulation.state.action_triggered.connect(
+        lambda _: progress.append((simulation.state.current_phase_elapsed, simulation.state.current_phase_remaining)))
+    simulation.run(create_plan([1000.0, 700.0]))
+    # actions fire 500ms apart up to each phase end
+    assert progress == [(500 * NANOSECONDS_PER_MILLISECOND, 500 * NANOSECONDS_PER_MILLISECOND),
+                        (1000 * NANOSECONDS_PER_MILLISECOND, 0),
+                        (200 * NANOSECONDS_PER_MILLISECOND, 500 * NANOSECONDS_PER_MILLISECOND),
+                        (700 * NANOSECONDS_PER_MILLISECOND, 0)]
+
+
+def test_gen3_actions_on_the_virtual_clock(simulation: Simulation, phase_factory: PhaseFactory, settings: QSettings):
+    model = Gen3Model(settings)
+    model.pre_timer.set(5000)
+    model.target_frame.set(1000)
+    phases = phase_factory.gen3(model)
+    assert phases == [5000, 16000.0]
+    actions = run_actions(simulation, phases)
+    assert len(actions) == 12
+    assert actions == counted_down_to(5000, 21000)
+    assert simulation.now == 21000 * NANOSECONDS_PER_MILLISECOND
+
+
+def test_gen4_actions_on_the_virtual_clock(simulation: Simulation, phase_factory: PhaseFactory, settings: QSettings):
+    model = Gen4Model(settings)
+    # calibrated at delay 500 on second 14: 500 - 875 delays early, a -6000ms calibration
+    phases = phase_factory.gen4(model)
+    assert phases == [34600.0, 15600.0]
+    actions = run_actions(simulation, phases)
+    assert len(actions) == 12
+    assert actions == counted_down_to(34600, 50200)
+    assert simulation.now == 50200 * NANOSECONDS_PER_MILLISECOND
+
+
+@pytest.mark.parametrize('mode, expected_phases, phase_ends', [
+    (Gen5Mode.STANDARD, [48680.0], (48680,)),
+    (Gen5Mode.C_GEAR, [29480.0, 20720.0], (29480, 50200)),
+    (Gen5Mode.ENTRALINK, [29730.0, 16624.0], (29730, 46354)),
+])
+def test_gen5_actions_on_the_virtual_clock(simulation: Simulation,
+                                           phase_factory: PhaseFactory,
+                                           settings: QSettings,
+                                           mode: Gen5Mode,
+                                           expected_phases: list[float],
+                                           phase_ends: tuple[int, ...]):
+    model = Gen5Model(settings)
+    model.mode.set(mode)
+    phases = phase_factory.gen5(model)
+    assert phases == expected_phases
+    actions = run_actions(simulation, phases)
+    assert len(actions) == 6 * len(phase_ends)
+    assert actions == counted_down_to(*phase_ends)
+    assert simulation.now == phase_ends[-1] * NANOSECONDS_PER_MILLISECOND
+
+
+def test_custom_actions_on_the_virtual_clock(simulation: Simulation,
+                                             phase_factory: PhaseFactory,
+                                             settings: QSettings):
+    model = CustomTimerModel(settings)
+    model.append(CustomPhase(CustomPhase.Unit.MILLISECONDS, 1234))
+    model.append(CustomPhase(CustomPhase.Unit.ADVANCES, 100, 10.0))
+    phases = phase_factory.custom(model)
+    assert phases == [1234.0, 1610.0]
+    actions = run_actions(simulation, phases)
+    # phases shorter than the countdown only get the actions that fit in them
+    assert actions == [ms * NANOSECONDS_PER_MILLISECOND for ms in (234, 734, 1234, 1344, 1844, 2344, 2844)]
+    assert simulation.now == 2844 * NANOSECONDS_PER_MILLISECOND
+
+
+def test_latency_compensation_is_capped(settings: QSettings, timer_settings: TimerSettingsModel):
+    advanced_settings = AdvancedSettingsModel(settings)
+    advanced_settings.latency_compensation.set(True)
+    simulation = Simulation(timer_settings, ActionSettingsModel(settings), advanced_settings)
+    simulation.runner.record_dispatch_latency(10 * NANOSECONDS_PER_MILLISECOND)
+    actions = run_actions(simulation, [1000.0])
+    lead = PhaseRunner.MAX_ACTION_LEAD
+    assert actions == [500 * NANOSECONDS_PER_MILLISECOND - lead, 1000 * NANOSECONDS_PER_MILLISECOND - lead]
+
+
+def test_latency_compensation_is_opt_in(simulation: Simulation):
+    simulation.runner.record_dispatch_latency(10 * NANOSECONDS_PER_MILLISECOND)
+    assert run_actions(simulation, [1000.0]) == [500 * NANOSECONDS_PER_MILLISECOND, 1000 * NANOSECONDS_PER_MILLISECOND]
+
+
+def test_updating_only_the_current_phase_shifts_the_run(simulation: Simulation, monkeypatch):
+    compiled = []
+    compile_timeline = Timeline.compile.__func__
+    monkeypatch.setattr(Timeline, 'compile',
+                        classmethod(lambda cls, *args: compiled.append(args[0]) or compile_timeline(cls, *args)))
+    phases = []
+    updated = []
+
+    def update_once(_):
+        if not updated:
+            updated.append(create_plan([900.0, 1000.0]))
+            simulation.runner.update_phases(updated[0])
+
+    simulation.state.action_triggered.connect(update_once)
+    simulation.state.phases_changed.connect(phases.append)
+    actions = run_actions(simulation, [1000.0, 1000.0])
+    # the first phase keeps its two actions, so nothing is compiled beyond the plan itself
+    assert compiled == [create_plan([1000.0, 1000.0])]
+    assert phases[-1] == list(updated[0])
+    assert actions == [ms * NANOSECONDS_PER_MILLISECOND for ms in (500, 900, 1400, 1900)]
+    assert simulation.now == 1900 * NANOSECONDS_PER_MILLISECOND
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import argparse
+import statistics
+import sys
+from collections import defaultdict
+
+from eon_timer.engine.trace import Trace, TraceKind, list_traces, trace_dir
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(required=True)
+    # analyze
+    subparser = subparsers.add_parser('analyze', help='Report wake-up jitter and trigger error from run traces')
+    subparser.add_argument('directory', nargs='?', default=trace_dir('EonTimer', 'DasAmpharos'))
+    subparser.add_argument('-w', '--bin-width', type=float, default=50.0, help='histogram bin width in microseconds')
+    subparser.set_defaults(func=analyze)
+
+    # parse arguments
+    args = parser.parse_args()
+    return args.func(args)
+
+
+def analyze(args: argparse.Namespace) -> int:
+    if args.bin_width <= 0:
+        print(f'Invalid bin width {args.bin_width}', file=sys.stderr)
+        return -1
+    paths = list_traces(args.directory)
+    if not paths:
+        print(f'No traces in {args.directory}', file=sys.stderr)
+        return -1
+
+    # kind -> values in ns, and phase index -> kind -> values in ns
+    values: dict[int, list[int]] = defaultdict(list)
+    phases: dict[int, dict[int, list[int]]] = defaultdict(lambda: defaultdict(list))
+    records = 0
+    dropped = 0
+    for path in paths:
+        try:
+            trace = Trace.read(path)
+        except (OSError, ValueError) as e:
+            print(f'Skipping {path}: {e}', file=sys.stderr)
+            continue
+        records += len(trace)
+        dropped += trace.dropped
+        for kind, phase_index, _, value in trace:
+            values[kind].append(value)
+            phases[phase_index][kind].append(value)
+    print(f'{len(paths)} traces, {records} records' + (f', {dropped} dropped by full buffers' if dropped else ''))
+
+    print('\nWake-up jitter')
+    __print_summary(values[TraceKind.WAKE])
+    print('\nTrigger error')
+    __print_summary(values[TraceKind.ACTION])
+    __print_histogram(values[TraceKind.ACTION], int(args.bin_width * 1000))
+
+    print('\nPer phase')
+    print(f'{"phase":>5} {"wakes":>6} {"jitter":>9} {"max":>9} {"actions":>7} {"error":>9} {"max":>9} {"boundary":>9}')
+    for phase_index in sorted(phases):
+        kinds = phases[phase_index]
+        wakes = kinds[TraceKind.WAKE]
+        actions = kinds[TraceKind.ACTION]
+        boundaries = kinds[TraceKind.PHASE_END]
+        print(f'{phase_index + 1:>5} {len(wakes):>6} {__mean(wakes):>9} {__max(wakes):>9} '
+              f'{len(actions):>7} {__mean(actions):>9} {__max(actions):>9} {__mean(boundaries):>9}')
+    return 0
+
+
+def __print_summary(samples: list[int]):
+    if not samples:
+        print('  no samples')
+        return
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2] / 1000
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] / 1000
+    stdev = statistics.pstdev(ordered) / 1000
+    print(f'  n={len(ordered)} mean={statistics.fmean(ordered) / 1000:.1f}us stdev={stdev:.1f}us '
+          f'p50={p50:.1f}us p99={p99:.1f}us max={ordered[-1] / 1000:.1f}us')
+
+
+def __print_histogram(samples: list[int], bin_width: int):
+    if not samples:
+        return
+    bins: dict[int, int] = defaultdict(int)
+    for sample in samples:
+        bins[sample // bin_width] += 1
+    widest = max(bins.values())
+    # empty bins are left out, so a single outlier does not print hundreds of rows
+    for index in sorted(bins):
+        count = bins[index]
+        low = index * bin_width / 1000
+        label = f'{low:.0f}..{low + bin_width / 1000:.0f}us'
+        print(f'  {label:>16} {"#" * round(40 * count / widest):<40} {count}')
+
+
+def __mean(samples: list[int]) -> str:
+    return f'{statistics.fmean(samples) / 1000:.1f}us' if samples else '-'
+
+
+def __max(samples: list[int]) -> str:
+    return f'{max(samples) / 1000:.1f}us' if samples else '-'
+
+
+if __name__ == '__main__':
+    sys.exit(main())